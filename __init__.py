@@ -1,9 +1,13 @@
-from flask import Flask
+from flask import Flask, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_login import LoginManager
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from dotenv import load_dotenv
+from werkzeug.middleware.proxy_fix import ProxyFix
+import logging
+import orjson
 import os
 
 
@@ -11,8 +15,50 @@ import os
 load_dotenv()
 
 
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson for request parsing, jsonify and dict responses.
+    Output matches the default provider: sorted keys, HTTP-date datetimes, non-str keys allowed.
+    """
+
+    def dumps_bytes(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # DefaultJSONProvider.default: dates, UUIDs, dataclasses and __html__ objects like jsonify
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Same argument handling as jsonify(): one positional value, several as a list, or kwargs as a dict
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else (args or kwargs or None)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
+
+
+def restful_output_json(data, code, headers=None):
+    """Flask-RESTful representation for Api.representations, serializing with the app's orjson provider"""
+    resp = make_response(app.json.dumps_bytes(data, indent=app.debug) + b"\n", code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
 # Setup of key Flask object (app)
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+
+# Deployed behind one nginx proxy (deploy_flask_nginx): take the client address and scheme from
+# its X-Forwarded-* headers, so request.remote_addr is the real client rather than 127.0.0.1
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1)
 
 # Configure Flask Port, default to 8401 which is same as Docker setup
 app.config['FLASK_PORT'] = int(os.environ.get('FLASK_PORT') or 8401)
@@ -71,7 +117,7 @@ app.config['JWT_TOKEN_NAME'] = JWT_TOKEN_NAME
 
 # Database settings
 IS_PRODUCTION = os.environ.get('IS_PRODUCTION') or None
-dbName = 'user_management'
+dbName = os.environ.get('DB_NAME') or 'user_management'
 DB_ENDPOINT = os.environ.get('DB_ENDPOINT') or None
 DB_USERNAME = os.environ.get('DB_USERNAME') or None
 DB_PASSWORD = os.environ.get('DB_PASSWORD') or None
@@ -82,6 +128,16 @@ if DB_ENDPOINT and DB_USERNAME and DB_PASSWORD:
    dbString = f'mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_ENDPOINT}:{DB_PORT}'
    dbURI =  dbString + '/' + dbName
    backupURI = None  # MySQL backup would require a different approach
+   # Pool sized for one connection per gunicorn thread plus the background audit writer;
+   # pre-ping and recycle replace connections MySQL has dropped for idling; LIFO reuse keeps
+   # the warmest connections busy so surplus idle ones are the ones that age out
+   app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+      'pool_size': 10,
+      'max_overflow': 5,
+      'pool_pre_ping': True,
+      'pool_recycle': 1800,
+      'pool_use_lifo': True,
+   }
 else:
    # Development - Use SQLite
    dbString = 'sqlite:///volumes/'
@@ -100,6 +156,10 @@ db = SQLAlchemy(app)
 migrate = Migrate(app, db)
 
 
+# Logging settings: INFO in production so debug lines are skipped before formatting
+app.logger.setLevel(logging.INFO if IS_PRODUCTION else logging.DEBUG)
+
+
 # Image upload settings
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # maximum size of uploaded content
 app.config['UPLOAD_EXTENSIONS'] = ['.jpg', '.png', '.gif']  # supported file types
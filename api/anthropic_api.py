@@ -1,12 +1,25 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response
 import requests
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
+import hashlib
 import json
+import orjson
 import re
+import threading
 
 
 anthropic_api = Blueprint('anthropic_api', __name__)
 
 
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+# Shared HTTP session so the TCP/TLS connection to Groq is reused across requests
+# instead of being re-established for every quiz submission
+groq_session = requests.Session()
+groq_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=50))
+
+
 # FIXED PERSONALITY TYPES FOR CONSISTENT MATCHING
 PERSONALITY_TYPES = {
    "The Leader": {
@@ -140,6 +153,79 @@ PERSONALITY_TYPES = {
 }
 
 
+# Response bodies for each type, serialized once since they never change
+TYPE_BODIES = {name: orjson.dumps(info) for name, info in PERSONALITY_TYPES.items()}
+
+
+def personality_response(type_name):
+   """Return the pre-serialized JSON body for a personality type"""
+   return Response(TYPE_BODIES[type_name], status=200, mimetype='application/json')
+
+
+# Static parts of the classification prompt, built once at import since PERSONALITY_TYPES never changes
+TYPES_LIST = "\n".join(f"- {name}: {info['description'][:100]}..." for name, info in PERSONALITY_TYPES.items())
+
+PROMPT_TEMPLATE = f"""Based on these personality quiz responses (including some free-response answers), classify the person into ONE of these EXACT personality types:
+
+
+{TYPES_LIST}
+
+
+Quiz Responses:
+{{responses}}
+
+
+Pay special attention to the free-response answers as they reveal deeper personality traits. Analyze all responses together and determine which ONE personality type fits best. Respond with ONLY the exact type name from the list above, nothing else. Choose from:
+The Leader, The Empath, The Analyst, The Adventurer, The Creative, The Peacemaker, The Guardian, The Visionary"""
+
+SYSTEM_MESSAGE = {
+   "role": "system",
+   "content": "You are a personality classification expert. Respond with ONLY the personality type name, nothing else."
+}
+
+# Fuzzy matching: one case-insensitive scan over the AI output for any of the type names
+TYPE_NAME_PATTERN = re.compile("|".join(re.escape(name) for name in PERSONALITY_TYPES), re.IGNORECASE)
+TYPE_NAMES_BY_LOWER = {name.lower(): name for name in PERSONALITY_TYPES}
+
+# Local scoring: the top archetype must beat the runner-up by this factor to skip the LLM
+LOCAL_CONFIDENCE_RATIO = 2.0
+
+
+# Groq classifications keyed by a hash of the canonical responses, so identical retakes skip the API
+classification_cache = TTLCache(maxsize=10_000, ttl=86400)
+classification_cache_lock = threading.Lock()
+
+
+def responses_cache_key(responses):
+   """Stable digest of the quiz responses, independent of key order and whitespace"""
+   canonical = json.dumps(responses, sort_keys=True, separators=(',', ':'))
+   return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+
+def classify_locally(responses):
+   """
+   Score multiple-choice answers that carry archetype weights, e.g.
+   {"question": ..., "answer": ..., "weights": {"The Leader": 1, "The Analyst": 0.5}}.
+   Returns a type name when one archetype clearly wins, else None so the LLM decides.
+   Any free-response answer always goes to the LLM.
+   """
+   scores = dict.fromkeys(PERSONALITY_TYPES, 0.0)
+   for r in responses:
+       if r.get('type', 'multipleChoice') == 'freeResponse':
+           return None
+       weights = r.get('weights')
+       if not isinstance(weights, dict):
+           continue
+       for type_name, weight in weights.items():
+           if type_name in scores and isinstance(weight, (int, float)):
+               scores[type_name] += weight
+
+   first, second = sorted(scores.values(), reverse=True)[:2]
+   if first <= 0 or first <= LOCAL_CONFIDENCE_RATIO * second:
+       return None
+   return max(scores, key=scores.get)
+
+
 @anthropic_api.route('/api/analyze-personality', methods=['POST'])
 def analyze_personality():
    """
@@ -156,52 +242,49 @@ def analyze_personality():
            return jsonify({'error': 'No responses provided'}), 400
 
 
+       # Confident multiple-choice quizzes are classified without the Groq round-trip
+       local_type = classify_locally(responses)
+       if local_type:
+           current_app.logger.debug("Locally classified as: %s", local_type)
+           return personality_response(local_type)
+
+
+       cache_key = responses_cache_key(responses)
+       with classification_cache_lock:
+           cached_type = classification_cache.get(cache_key)
+       if cached_type:
+           current_app.logger.debug("Cached classification: %s", cached_type)
+           return personality_response(cached_type)
+
+
        # Get Groq API key
        api_key = current_app.config.get('GROQ_API_KEY')
 
 
        if not api_key:
-           print("⚠️ Groq API not configured, using fallback")
-           return jsonify(PERSONALITY_TYPES["The Peacemaker"]), 200
+           current_app.logger.warning("Groq API not configured, using fallback")
+           return personality_response("The Peacemaker")
 
 
        # Build the prompt with fixed types
        # Format responses, highlighting free-response answers for deeper analysis
-       responses_text = []
-       for r in responses:
-           answer_type = r.get('type', 'multipleChoice')
-           if answer_type == 'freeResponse':
-               responses_text.append(f"Q: {r['question']}\nA (free response): {r['answer']}")
-           else:
-               responses_text.append(f"Q: {r['question']}\nA: {r['answer']}")
-
-
-       responses_formatted = "\n\n".join(responses_text)
-
-
-       types_list = "\n".join([f"- {name}: {info['description'][:100]}..." for name, info in PERSONALITY_TYPES.items()])
-
-
-       prompt = f"""Based on these personality quiz responses (including some free-response answers), classify the person into ONE of these EXACT personality types:
-
-
-{types_list}
-
-
-Quiz Responses:
-{responses_formatted}
+       responses_formatted = "\n\n".join(
+           f"Q: {r['question']}\nA (free response): {r['answer']}"
+           if r.get('type', 'multipleChoice') == 'freeResponse'
+           else f"Q: {r['question']}\nA: {r['answer']}"
+           for r in responses
+       )
 
 
-Pay special attention to the free-response answers as they reveal deeper personality traits. Analyze all responses together and determine which ONE personality type fits best. Respond with ONLY the exact type name from the list above, nothing else. Choose from:
-The Leader, The Empath, The Analyst, The Adventurer, The Creative, The Peacemaker, The Guardian, The Visionary"""
+       prompt = PROMPT_TEMPLATE.format(responses=responses_formatted)
 
 
        # Call Groq API
-       print(f"🔑 Calling Groq API for personality classification...")
+       current_app.logger.debug("Calling Groq API for personality classification")
 
 
-       response = requests.post(
-           "https://api.groq.com/openai/v1/chat/completions",
+       response = groq_session.post(
+           GROQ_CHAT_URL,
            headers={
                'Authorization': f'Bearer {api_key}',
                'Content-Type': 'application/json'
@@ -209,10 +292,7 @@ The Leader, The Empath, The Analyst, The Adventurer, The Creative, The Peacemake
            json={
                "model": "llama-3.3-70b-versatile",
                "messages": [
-                   {
-                       "role": "system",
-                       "content": "You are a personality classification expert. Respond with ONLY the personality type name, nothing else."
-                   },
+                   SYSTEM_MESSAGE,
                    {
                        "role": "user",
                        "content": prompt
@@ -225,7 +305,7 @@ The Leader, The Empath, The Analyst, The Adventurer, The Creative, The Peacemake
        )
 
 
-       print(f"📡 Groq API response status: {response.status_code}")
+       current_app.logger.debug("Groq API response status: %s", response.status_code)
 
 
        if response.status_code == 200:
@@ -233,36 +313,39 @@ The Leader, The Empath, The Analyst, The Adventurer, The Creative, The Peacemake
            classified_type = api_data['choices'][0]['message']['content'].strip()
 
 
-           print(f"✅ AI classified as: {classified_type}")
+           current_app.logger.debug("AI classified as: %s", classified_type)
 
 
            # Match to our fixed types
            if classified_type in PERSONALITY_TYPES:
-               result = PERSONALITY_TYPES[classified_type]
-               print(f"✨ Matched to personality type: {classified_type}")
-               return jsonify(result), 200
+               current_app.logger.debug("Matched to personality type: %s", classified_type)
+               with classification_cache_lock:
+                   classification_cache[cache_key] = classified_type
+               return personality_response(classified_type)
            else:
                # Fuzzy match if exact match fails
-               for type_name in PERSONALITY_TYPES.keys():
-                   if type_name.lower() in classified_type.lower():
-                       result = PERSONALITY_TYPES[type_name]
-                       print(f"✨ Fuzzy matched to: {type_name}")
-                       return jsonify(result), 200
+               match = TYPE_NAME_PATTERN.search(classified_type)
+               if match:
+                   type_name = TYPE_NAMES_BY_LOWER[match.group(0).lower()]
+                   current_app.logger.debug("Fuzzy matched to: %s", type_name)
+                   with classification_cache_lock:
+                       classification_cache[cache_key] = type_name
+                   return personality_response(type_name)
 
 
                # Default to Peacemaker if no match
-               print(f"⚠️ No match found, defaulting to Peacemaker")
-               return jsonify(PERSONALITY_TYPES["The Peacemaker"]), 200
+               current_app.logger.info("No personality type match for %r, defaulting to Peacemaker", classified_type)
+               return personality_response("The Peacemaker")
 
 
        else:
-           print(f"❌ API Error, using default type")
-           return jsonify(PERSONALITY_TYPES["The Peacemaker"]), 200
+           current_app.logger.error("Groq API error %s, using default type", response.status_code)
+           return personality_response("The Peacemaker")
 
 
    except Exception as e:
-       print(f"❌ Error in analyze-personality: {e}")
-       return jsonify(PERSONALITY_TYPES["The Peacemaker"]), 200
+       current_app.logger.exception("Error in analyze-personality: %s", e)
+       return personality_response("The Peacemaker")
 
 
 
@@ -1,23 +1,94 @@
 """
 Control Panel API - Provides endpoints for monitoring, metrics, logs, and database operations
 """
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import Blueprint, jsonify, request, send_file, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from functools import wraps
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import io
-from sqlalchemy import desc
+import threading
+import orjson
+from cachetools import TTLCache
+from sqlalchemy import desc, func, select, tuple_
 
 from __init__ import db
 from model.database_audit import (
     DatabaseMetrics, ErrorLog, FetchLog, ChangeLog, DatabaseStatus,
-    get_database_metrics
+    get_database_metrics, clear_database_metrics_cache, get_activity_counts, audit_log_writer, utc_hours_ago
 )
 
 control_panel_api = Blueprint('control_panel_api', __name__, url_prefix='/api/control-panel')
 
+# Short-lived cache for the dashboard endpoints the control panel polls; cleared on pause/resume
+dashboard_cache = TTLCache(maxsize=4, ttl=15)
+dashboard_cache_lock = threading.Lock()
+
+
+def get_cached_dashboard(key):
+    """Return a cached dashboard payload, or None if missing or expired"""
+    with dashboard_cache_lock:
+        return dashboard_cache.get(key)
+
+
+def set_cached_dashboard(key, value):
+    """Store a dashboard payload in the cache"""
+    with dashboard_cache_lock:
+        dashboard_cache[key] = value
+
+
+def clear_dashboard_cache():
+    """Drop cached dashboard payloads so the next poll reflects a status change"""
+    with dashboard_cache_lock:
+        dashboard_cache.clear()
+    clear_database_metrics_cache()
+
+
+def json_response(payload, status=200):
+    """Serialize a payload with orjson in one pass"""
+    # Naive datetimes come out exactly as datetime.isoformat() would write them
+    body = orjson.dumps(payload)
+    return Response(body, status=status, mimetype='application/json')
+
+
+def select_fields(query, model, *extra_columns):
+    """Run a model query for only its DICT_FIELDS columns (then extra_columns), skipping instance loading"""
+    columns = [getattr(model, field) for field in model.DICT_FIELDS]
+    return query.with_entities(*columns, *extra_columns).all()
+
+
+def row_dict(model, row):
+    """Map a select_fields row onto the model's to_dict() keys (datetimes left for orjson)"""
+    return dict(zip(model.DICT_FIELDS, row))
+
+
+def paginate_logs(query, model, limit):
+    """
+    Apply keyset pagination to a log query: ?before=<iso timestamp>,<id> returns entries older than
+    the last page instead of using OFFSET. The id breaks ties between entries logged in the same
+    second (MySQL DATETIME has no fractional part), so none are skipped between pages. Returns the
+    page, the total number of matching entries (from the cursor onward) and the next page's cursor.
+    """
+    before = request.args.get('before')
+    if before:
+        before_ts, _, before_id = before.partition(',')
+        before_ts = datetime.fromisoformat(before_ts)
+        if before_id:
+            query = query.filter(tuple_(model.timestamp, model.id) < tuple_(before_ts, int(before_id)))
+        else:
+            # Timestamp-only cursors from before the id was added
+            query = query.filter(model.timestamp < before_ts)
+    
+    # COUNT(*) OVER () is evaluated before LIMIT, so the true total comes back with the page
+    query = query.order_by(desc(model.timestamp), desc(model.id)).limit(limit)
+    rows = select_fields(query, model, func.count().over())
+    logs = [row_dict(model, row) for row in rows]
+    total = rows[0][-1] if rows else 0
+    last = logs[-1] if len(logs) == limit else None
+    next_before = f"{last['timestamp'].isoformat()},{last['id']}" if last else None
+    return logs, total, next_before
+
 
 def admin_required(f):
     """Decorator to require admin role"""
@@ -36,20 +107,16 @@ def admin_required(f):
 def get_metrics():
     """Get current database metrics"""
     try:
-        metrics = get_database_metrics()
-        
-        # Get error count in last 24 hours
-        error_count = ErrorLog.query.filter(
-            ErrorLog.timestamp >= datetime.utcnow() - timedelta(days=1)
-        ).count()
-        
-        # Get fetch count in last 24 hours
-        fetch_count = FetchLog.query.filter(
-            FetchLog.timestamp >= datetime.utcnow() - timedelta(days=1)
-        ).count()
-        
-        metrics['errors_last_24h'] = error_count
-        metrics['fetches_last_24h'] = fetch_count
+        metrics = get_cached_dashboard('metrics')
+        if metrics is None:
+            metrics = get_database_metrics()
+            
+            # Get error and fetch counts in last 24 hours
+            error_count, fetch_count = get_activity_counts(utc_hours_ago(24))
+            
+            metrics['errors_last_24h'] = error_count
+            metrics['fetches_last_24h'] = fetch_count
+            set_cached_dashboard('metrics', metrics)
         
         return jsonify({'success': True, 'data': metrics}), 200
     except Exception as e:
@@ -63,14 +130,14 @@ def get_metrics_history():
     try:
         hours = request.args.get('hours', 24, type=int)
         
-        metrics = DatabaseMetrics.query.filter(
-            DatabaseMetrics.timestamp >= datetime.utcnow() - timedelta(hours=hours)
-        ).order_by(desc(DatabaseMetrics.timestamp)).limit(100).all()
+        rows = select_fields(DatabaseMetrics.query.filter(
+            DatabaseMetrics.timestamp >= utc_hours_ago(hours)
+        ).order_by(desc(DatabaseMetrics.timestamp)).limit(100), DatabaseMetrics)
         
-        return jsonify({
+        return json_response({
             'success': True,
-            'data': [m.to_dict() for m in metrics]
-        }), 200
+            'data': [row_dict(DatabaseMetrics, row) for row in rows]
+        })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -85,15 +152,20 @@ def get_error_logs():
         limit = request.args.get('limit', 50, type=int)
         hours = request.args.get('hours', 24, type=int)
         
-        logs = ErrorLog.query.filter(
-            ErrorLog.timestamp >= datetime.utcnow() - timedelta(hours=hours)
-        ).order_by(desc(ErrorLog.timestamp)).limit(limit).all()
+        query = ErrorLog.query.filter(
+            ErrorLog.timestamp >= utc_hours_ago(hours)
+        )
         
-        return jsonify({
+        logs, total, next_before = paginate_logs(query, ErrorLog, limit)
+        
+        return json_response({
             'success': True,
-            'count': len(logs),
-            'data': [log.to_dict() for log in logs]
-        }), 200
+            'count': total,
+            'data': logs,
+            'next_before': next_before
+        })
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid before cursor'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -105,19 +177,23 @@ def log_error():
     try:
         data = request.get_json()
         
-        error_log = ErrorLog(
+        row = dict(
             error_type=data.get('error_type', 'Unknown'),
             endpoint=data.get('endpoint', ''),
             error_message=data.get('error_message', ''),
             status_code=data.get('status_code', 0),
-            request_data=json.dumps(data.get('request_data', {})),
+            request_data=orjson.dumps(data.get('request_data', {})).decode(),
             user_id=current_user.id if current_user.is_authenticated else None
         )
         
-        db.session.add(error_log)
-        db.session.commit()
+        # Server errors are written before responding so they survive a worker crash
+        if isinstance(row['status_code'], int) and row['status_code'] >= 500:
+            audit_log_writer.write(ErrorLog, row)
+            return jsonify({'success': True, 'queued': False}), 201
         
-        return jsonify({'success': True, 'id': error_log.id}), 201
+        # Everything else is queued and written in batches by the background audit writer
+        audit_log_writer.enqueue(ErrorLog, row)
+        return jsonify({'success': True, 'queued': True}), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -134,19 +210,22 @@ def get_fetch_logs():
         error_only = request.args.get('error_only', False, type=bool)
         
         query = FetchLog.query.filter(
-            FetchLog.timestamp >= datetime.utcnow() - timedelta(hours=hours)
+            FetchLog.timestamp >= utc_hours_ago(hours)
         )
         
         if error_only:
             query = query.filter_by(is_error=True)
         
-        logs = query.order_by(desc(FetchLog.timestamp)).limit(limit).all()
+        logs, total, next_before = paginate_logs(query, FetchLog, limit)
         
-        return jsonify({
+        return json_response({
             'success': True,
-            'count': len(logs),
-            'data': [log.to_dict() for log in logs]
-        }), 200
+            'count': total,
+            'data': logs,
+            'next_before': next_before
+        })
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid before cursor'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -158,7 +237,7 @@ def log_fetch():
     try:
         data = request.get_json()
         
-        fetch_log = FetchLog(
+        audit_log_writer.enqueue(FetchLog, dict(
             endpoint=data.get('endpoint', ''),
             method=data.get('method', 'GET'),
             status_code=data.get('status_code', 0),
@@ -167,12 +246,9 @@ def log_fetch():
             user_agent=request.headers.get('User-Agent', ''),
             user_id=current_user.id if current_user.is_authenticated else None,
             is_error=data.get('status_code', 200) >= 400
-        )
+        ))
         
-        db.session.add(fetch_log)
-        db.session.commit()
-        
-        return jsonify({'success': True, 'id': fetch_log.id}), 201
+        return jsonify({'success': True, 'queued': True}), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -189,19 +265,22 @@ def get_change_logs():
         entity_type = request.args.get('entity_type', None)
         
         query = ChangeLog.query.filter(
-            ChangeLog.timestamp >= datetime.utcnow() - timedelta(hours=hours)
+            ChangeLog.timestamp >= utc_hours_ago(hours)
         )
         
         if entity_type:
             query = query.filter_by(entity_type=entity_type)
         
-        logs = query.order_by(desc(ChangeLog.timestamp)).limit(limit).all()
+        logs, total, next_before = paginate_logs(query, ChangeLog, limit)
         
-        return jsonify({
+        return json_response({
             'success': True,
-            'count': len(logs),
-            'data': [log.to_dict() for log in logs]
-        }), 200
+            'count': total,
+            'data': logs,
+            'next_before': next_before
+        })
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid before cursor'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -213,19 +292,16 @@ def log_change():
     try:
         data = request.get_json()
         
-        change_log = ChangeLog(
+        audit_log_writer.enqueue(ChangeLog, dict(
             entity_type=data.get('entity_type', ''),
             entity_id=data.get('entity_id', 0),
             action=data.get('action', 'update'),
-            old_values=json.dumps(data.get('old_values', {})),
-            new_values=json.dumps(data.get('new_values', {})),
+            old_values=orjson.dumps(data.get('old_values', {})).decode(),
+            new_values=orjson.dumps(data.get('new_values', {})).decode(),
             changed_by_user_id=current_user.id if current_user.is_authenticated else None
-        )
-        
-        db.session.add(change_log)
-        db.session.commit()
+        ))
         
-        return jsonify({'success': True, 'id': change_log.id}), 201
+        return jsonify({'success': True, 'queued': True}), 202
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -237,8 +313,7 @@ def log_change():
 def get_database_status():
     """Get current database status"""
     try:
-        status = DatabaseStatus.get_or_create()
-        return jsonify({'success': True, 'data': status.to_dict()}), 200
+        return jsonify({'success': True, 'data': DatabaseStatus.get_cached()}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -250,9 +325,9 @@ def pause_database():
     """Pause incoming data to the database (including matchmakers)"""
     try:
         reason = request.get_json().get('reason', 'User initiated pause')
-        status = DatabaseStatus.pause_incoming_data(reason)
-        # Also pause matchmakers data
-        DatabaseStatus.pause_matchmakers_data(reason)
+        # Incoming and matchmakers flags flip together so no request sees a half-paused state
+        status = DatabaseStatus.pause_all(reason)
+        clear_dashboard_cache()
         
         return jsonify({
             'success': True,
@@ -269,9 +344,8 @@ def pause_database():
 def resume_database():
     """Resume incoming data to the database (including matchmakers)"""
     try:
-        status = DatabaseStatus.resume_incoming_data()
-        # Also resume matchmakers data
-        DatabaseStatus.resume_matchmakers_data()
+        status = DatabaseStatus.resume_all()
+        clear_dashboard_cache()
         
         return jsonify({
             'success': True,
@@ -290,6 +364,7 @@ def pause_matchmakers():
     try:
         reason = request.get_json().get('reason', 'User initiated matchmakers pause')
         status = DatabaseStatus.pause_matchmakers_data(reason)
+        clear_dashboard_cache()
         
         return jsonify({
             'success': True,
@@ -307,6 +382,7 @@ def resume_matchmakers():
     """Resume incoming matchmakers data only"""
     try:
         status = DatabaseStatus.resume_matchmakers_data()
+        clear_dashboard_cache()
         
         return jsonify({
             'success': True,
@@ -323,14 +399,14 @@ def resume_matchmakers():
 @login_required
 @admin_required
 def export_data():
-    """Export database data as JSON"""
+    """Export database data as JSON, streamed row by row so large tables never sit in memory"""
     try:
         from model.user import User
         from model.post import Post
         from model.persona import Persona
         from model.matchmakers import MatchmakersData
         
-        export_data = {
+        header = {
             'exported_at': datetime.utcnow().isoformat(),
             'database_version': '1.0',
             'stats': {
@@ -341,15 +417,37 @@ def export_data():
             }
         }
         
-        # Create a JSON file in memory
-        json_data = json.dumps(export_data, indent=2, default=str)
+        # Plain column selects (no password hash, no relationship loading) fetched in batches
+        tables = {
+            'users': select(
+                User.id, User._uid.label('uid'), User._name.label('name'), User._email.label('email'),
+                User._sid.label('sid'), User._role.label('role'), User._school.label('school')
+            ),
+            'matchmakers': select(
+                MatchmakersData.id, MatchmakersData.user_id, MatchmakersData.section,
+                MatchmakersData.data, MatchmakersData.created_at, MatchmakersData.updated_at
+            ),
+        }
         
-        # Return as downloadable file
-        return jsonify({
-            'success': True,
-            'message': 'Export data generated',
-            'preview': export_data
-        }), 200
+        def generate():
+            # Reopen the header object so the row arrays can be appended as extra keys
+            yield json.dumps(header, default=str)[:-1]
+            for name, stmt in tables.items():
+                yield f', "{name}": ['
+                rows = db.session.execute(stmt.execution_options(yield_per=1000)).mappings()
+                for i, row in enumerate(rows):
+                    if i:
+                        yield ','
+                    yield json.dumps(dict(row), default=str)
+                yield ']'
+            yield '}'
+        
+        filename = f"database_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/json',
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -388,18 +486,15 @@ def import_data():
 def get_dashboard_summary():
     """Get complete dashboard summary"""
     try:
-        metrics = get_database_metrics()
-        status = DatabaseStatus.get_or_create()
+        summary = get_cached_dashboard('summary')
+        if summary is not None:
+            return jsonify({'success': True, 'data': summary}), 200
         
-        # Get error count in last 24 hours
-        error_count = ErrorLog.query.filter(
-            ErrorLog.timestamp >= datetime.utcnow() - timedelta(days=1)
-        ).count()
+        metrics = get_database_metrics()
+        status = DatabaseStatus.get_cached()
         
-        # Get fetch count in last 24 hours
-        fetch_count = FetchLog.query.filter(
-            FetchLog.timestamp >= datetime.utcnow() - timedelta(days=1)
-        ).count()
+        # Get error and fetch counts in last 24 hours
+        error_count, fetch_count = get_activity_counts(utc_hours_ago(24))
         
         # Get recent changes (last 5)
         recent_changes = ChangeLog.query.order_by(
@@ -413,13 +508,14 @@ def get_dashboard_summary():
         
         summary = {
             'metrics': metrics,
-            'status': status.to_dict(),
+            'status': status,
             'errors_last_24h': error_count,
             'fetches_last_24h': fetch_count,
             'recent_changes': [c.to_dict() for c in recent_changes],
             'recent_errors': [e.to_dict() for e in recent_errors],
             'timestamp': datetime.utcnow().isoformat(),
         }
+        set_cached_dashboard('summary', summary)
         
         return jsonify({'success': True, 'data': summary}), 200
     except Exception as e:
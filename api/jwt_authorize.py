@@ -1,9 +1,47 @@
 from flask import request
 from flask import current_app, g
 from functools import wraps
+from cachetools import TTLCache
+import hashlib
+import threading
+import time
 import jwt
+from __init__ import db
 from model.user import User
 
+# Validated tokens keyed by a digest of the raw cookie, mapping to (user id, _uid, expiry) so a
+# session re-presenting the same token skips jwt.decode and finds its user by primary key.
+# Only successful validations are cached; entries never outlive the token's own exp claim.
+TOKEN_CACHE_TTL = 300
+token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+token_cache_lock = threading.Lock()
+
+
+def token_cache_key(token):
+    return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
+
+
+def cached_token_user(key):
+    """User for a previously validated token, or None when it must be decoded again"""
+    with token_cache_lock:
+        cached = token_cache.get(key)
+    if cached is None:
+        return None
+    user_id, uid, expires_at = cached
+    if expires_at <= time.time():
+        return None
+    user = db.session.get(User, user_id)
+    # A renamed uid would no longer match the token's _uid claim
+    return user if user is not None and user._uid == uid else None
+
+
+def cache_token_user(key, user, claims):
+    expires_at = time.time() + TOKEN_CACHE_TTL
+    if 'exp' in claims:
+        expires_at = min(expires_at, claims['exp'])
+    with token_cache_lock:
+        token_cache[key] = (user.id, user._uid, expires_at)
+
 def token_required(roles=None):
     '''
     This function is used to guard API endpoints that require authentication.
@@ -30,15 +68,19 @@ def token_required(roles=None):
                     "error": "Unauthorized"
                 }, 401
             try:
-                # Decode the token and retrieve the user data
-                data = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
-                current_user = User.query.filter_by(_uid=data["_uid"]).first()
+                key = token_cache_key(token)
+                current_user = cached_token_user(key)
                 if current_user is None:
-                    return {
-                        "message": "Invalid Authentication token!",
-                        "data": None,
-                        "error": "Unauthorized"
-                    }, 401
+                    # Decode the token and retrieve the user data
+                    data = jwt.decode(token, current_app.config["SECRET_KEY"], algorithms=["HS256"])
+                    current_user = User.query.filter_by(_uid=data["_uid"]).first()
+                    if current_user is None:
+                        return {
+                            "message": "Invalid Authentication token!",
+                            "data": None,
+                            "error": "Unauthorized"
+                        }, 401
+                    cache_token_user(key, current_user, data)
                     
                 # Check user has the required role, when role is required 
                 if roles and current_user.role not in roles:
@@ -1,13 +1,19 @@
 ## Create Users, Get User Data, Store Data, Change Data
 
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, request, jsonify, g, Response, current_app
 from flask_restful import Api, Resource
 from datetime import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from __init__ import restful_output_json
 from api.jwt_authorize import token_required
 from model.user import User
 from model.matchmakers import MatchmakersData
+import model.matchmakers as matchmakers_model
 from model.database_audit import DatabaseStatus
-import json
+import orjson
+import hashlib
+import threading
+from cachetools import TTLCache
 from functools import wraps
 
 # Create the blueprint
@@ -15,6 +21,12 @@ matchmaking_bio_api = Blueprint('matchmaking_bio_api', __name__, url_prefix='/ap
 
 # API docs https://flask-restful.readthedocs.io/en/latest/api.html
 api = Api(matchmaking_bio_api)
+api.representations['application/json'] = restful_output_json  # orjson instead of stdlib json
+
+# Serialized /all-data body and ETag, keyed by the matchmakers data version. Writes in this
+# process bump the version immediately; the TTL bounds staleness from other workers' writes.
+all_data_cache = TTLCache(maxsize=1, ttl=30)
+all_data_cache_lock = threading.Lock()
 
 
 def matchmakers_write_allowed():
@@ -22,9 +34,9 @@ def matchmakers_write_allowed():
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            status = DatabaseStatus.get_or_create()
-            if status.is_matchmakers_paused:
-                return {'message': f'Matchmakers data is currently paused. Reason: {status.matchmakers_pause_reason}'}, 403
+            status = DatabaseStatus.get_cached()
+            if status['is_matchmakers_paused']:
+                return {'message': f'Matchmakers data is currently paused. Reason: {status["matchmakers_pause_reason"]}'}, 403
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -39,15 +51,10 @@ class MatchmakingAPI:
             uid = current_user.uid
             
             try:
-                # Get user's matchmakers data
-                user_data_records = MatchmakersData.get_user_matchmakers_data(current_user.id)
+                # All of the user's sections combined into one dict by the database
+                data = MatchmakersData.get_user_sections_aggregated(current_user.id)
                 
-                if user_data_records:
-                    # Combine all sections into a single response
-                    data = {}
-                    for record in user_data_records:
-                        data[record.section] = record.data
-                    
+                if data:
                     return {
                         'message': f'Data for {uid}',
                         'data': data
@@ -59,8 +66,9 @@ class MatchmakingAPI:
                     'data': {}
                 }, 404
                 
-            except Exception as e:
-                return {'message': f'Error retrieving data: {str(e)}'}, 500
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _DATA: %s", e)
+                return {'message': 'Error retrieving data'}, 500
 
     class _WRITE(Resource):
         @token_required()
@@ -80,28 +88,20 @@ class MatchmakingAPI:
                 return {'message': 'data field is required'}, 400
             
             try:
-                # Check if record exists
-                existing_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section=section)
-                
-                if existing_records:
-                    # Update existing
-                    record = existing_records[0]
-                    record.update(data)
-                    message = f'Data updated for section {section}'
-                else:
-                    # Create new
-                    record = MatchmakersData(current_user, section, data)
-                    record.create()
-                    message = f'Data created for section {section}'
+                # Insert or replace the section in one statement
+                MatchmakersData.upsert_section(current_user.id, section, data)
                 
                 return {
-                    'message': message,
+                    'message': f'Data saved for section {section}',
                     'section': section,
                     'data': data
                 }, 201
                 
-            except Exception as e:
-                return {'message': f'Error writing data: {str(e)}'}, 500
+            except ValueError as ve:
+                return {'message': str(ve)}, 400
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _WRITE: %s", e)
+                return {'message': 'Error writing data'}, 500
 
     class _SETUP(Resource):
         @token_required()
@@ -109,24 +109,27 @@ class MatchmakingAPI:
         def post(self):
             """Initialize profile setup for the current user."""
             current_user = g.current_user
+            uid, user_id = current_user.uid, current_user.id
 
             # Check if profile setup already exists
-            existing_records = MatchmakersData.get_user_matchmakers_data(current_user.id)
-            if existing_records:
-                return {'message': f'Profile setup for {current_user.uid} already created'}, 409
+            if MatchmakersData.exists_for_user(user_id):
+                return {'message': f'Profile setup for {uid} already created'}, 409
 
             # Create new profile setup record
             try:
                 setup_record = MatchmakersData(current_user, 'profile', {})
-                setup_record.create()
                 
                 return {
-                    'message': f'Profile setup initialized for {current_user.uid}', 
-                    'data': setup_record.read()
+                    'message': f'Profile setup initialized for {uid}', 
+                    'data': setup_record.create_and_read()
                 }, 201
                     
-            except Exception as e:
-                return {'message': f'Error initializing profile setup: {str(e)}'}, 500
+            except ValueError as ve:
+                # Raised by create() when a concurrent request made the record first
+                return {'message': str(ve)}, 409
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _SETUP: %s", e)
+                return {'message': 'Error initializing profile setup'}, 500
 
     class _ADD(Resource):
         @token_required()
@@ -134,11 +137,10 @@ class MatchmakingAPI:
         def post(self):
             """Add custom indexed data to the user's profile."""
             current_user = g.current_user
+            uid, user_id = current_user.uid, current_user.id
             body = request.get_json() or {}
             
-            print(f"=== ADD ENDPOINT HIT ===")
-            print(f"User: {current_user.uid}")
-            print(f"Body: {body}")
+            current_app.logger.debug("Add endpoint: user=%s body=%s", uid, body)
             
             # Validate required fields
             index = body.get('index')
@@ -146,48 +148,34 @@ class MatchmakingAPI:
             
             if not index:
                 return {'message': 'index field is required'}, 400
+            if not isinstance(index, (str, int, float)):
+                return {'message': 'index must be a string'}, 400
+            index = str(index)  # JSON object keys are strings; a numeric index is stored under its text
             if data_value is None:
                 return {'message': 'data field is required'}, 400
             
             try:
-                # Get user's profile record
-                profile_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
-                
-                if not profile_records:
-                    # Create profile record if it doesn't exist
-                    print(f"Creating new profile for {current_user.uid}")
-                    profile_record = MatchmakersData(current_user, 'profile', {})
-                    profile_record.create()
-                else:
-                    profile_record = profile_records[0]
-                    print(f"Found existing profile for {current_user.uid}")
-                
-                # Update the data dict
-                current_data = profile_record.data if profile_record.data else {}
-                current_data[index] = data_value
+                # Set the index on the user's profile record, creating it if needed, in one statement
+                MatchmakersData.upsert_index(user_id, 'profile', index, data_value)
                 
-                # Update the record
-                profile_record.update(current_data)
-                
-                print(f"Successfully saved data for {current_user.uid}")
+                current_app.logger.debug("Saved data for %s", uid)
                 
                 return {
-                    'message': f'Data added to profile for {current_user.uid}',
+                    'message': f'Data added to profile for {uid}',
                     'index': index,
                     'data': data_value
                 }, 201
                 
-            except Exception as e:
-                print(f"ERROR in _ADD: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                return {'message': f'Error adding data: {str(e)}'}, 500
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _ADD: %s", e)
+                return {'message': 'Error adding data'}, 500
 
         @token_required()
         @matchmakers_write_allowed()
         def delete(self):
             """Delete data by index from the user's profile."""
             current_user = g.current_user
+            uid, user_id = current_user.uid, current_user.id
             body = request.get_json() or {}
             
             # Validate required field
@@ -195,16 +183,19 @@ class MatchmakingAPI:
             
             if not index:
                 return {'message': 'index field is required'}, 400
+            if not isinstance(index, (str, int, float)):
+                return {'message': 'index must be a string'}, 400
+            index = str(index)
             
             try:
                 # Get user's profile record
-                profile_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
+                profile_records = MatchmakersData.get_user_matchmakers_data(user_id, section='profile')
                 
                 if not profile_records:
-                    return {'message': f'No profile setup found for {current_user.uid}'}, 404
+                    return {'message': f'No profile setup found for {uid}'}, 404
                 
                 profile_record = profile_records[0]
-                current_data = profile_record.data if profile_record.data else {}
+                current_data = dict(profile_record.data) if profile_record.data else {}
                 
                 # Check if index exists
                 if index not in current_data:
@@ -213,53 +204,60 @@ class MatchmakingAPI:
                         'full_data': current_data
                     }, 404
                 
-                # Delete the indexed data
+                # Delete the indexed data in SQL; only the key goes over the wire
                 deleted_data = current_data.pop(index)
-                
-                # Update the record
-                profile_record.update(current_data)
+                MatchmakersData.remove_index(user_id, 'profile', index)
                 
                 return {
-                    'message': f'Data at index "{index}" deleted for {current_user.uid}',
+                    'message': f'Data at index "{index}" deleted for {uid}',
                     'deleted_data': deleted_data,
                     'remaining_data': current_data
                 }, 200
                 
-            except Exception as e:
-                return {'message': f'Error deleting data: {str(e)}'}, 500
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _ADD.delete: %s", e)
+                return {'message': 'Error deleting data'}, 500
 
     class _ALL_DATA(Resource):
         def get(self):
             """Get all users' profile data (public endpoint)."""
             try:
-                all_records = MatchmakersData.get_all_matchmakers_data()
+                version = matchmakers_model.data_version
+                with all_data_cache_lock:
+                    cached = all_data_cache.get(version)
+                if cached is None:
+                    cached = self.build_body()
+                    with all_data_cache_lock:
+                        all_data_cache[version] = cached
                 
-                # Group by user
-                user_data = {}
-                for record in all_records:
-                    uid = record.user.uid if record.user else f"user_{record.user_id}"
-                    if uid not in user_data:
-                        user_data[uid] = {
-                            'id': record.user_id,
-                            'uid': uid,
-                            'data': {}
-                        }
-                    user_data[uid]['data'][record.section] = record.data
-                
-                return {
-                    'message': 'All profile data',
-                    'total_users': len(user_data),
-                    'users': list(user_data.values())
-                }, 200
-            except Exception as e:
-                return {'message': f'Error retrieving all data: {str(e)}'}, 500
+                body, etag = cached
+                response = Response(body, status=200, mimetype='application/json')
+                response.set_etag(etag)
+                return response.make_conditional(request)
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _ALL_DATA: %s", e)
+                return {'message': 'Error retrieving all data'}, 500
+        
+        @staticmethod
+        def build_body():
+            """Serialized response body and its ETag, from per-user rows grouped by the database."""
+            users = [
+                {'id': user_id, 'uid': uid or f"user_{user_id}", 'data': data}
+                for user_id, uid, data in MatchmakersData.get_all_grouped()
+            ]
+            body = orjson.dumps({
+                'message': 'All profile data',
+                'total_users': len(users),
+                'users': users
+            })
+            return body, hashlib.md5(body).hexdigest()
     
     class _SAVE_PROFILE_JSON(Resource):
         @token_required()
         def post(self):
             """Save frontend quiz/profile data to the database"""
             current_user = g.current_user
-            uid = current_user.uid
+            uid, user_id = current_user.uid, current_user.id
 
             body = request.get_json() or {}
             profile_data = body.get('profile_data')
@@ -268,33 +266,19 @@ class MatchmakingAPI:
                 return {'message': 'No profile_data provided'}, 400
 
             try:
-                # Use MatchmakersData (DB) to store profile quiz under section 'profile'
-                profile_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
-                
-                if not profile_records:
-                    # create a new profile record with the quiz data
-                    new_data = {'profile_quiz': profile_data}
-                    profile_record = MatchmakersData(current_user, 'profile', new_data)
-                    profile_record.create()
-                else:
-                    # Update existing record
-                    profile_record = profile_records[0]
-                    # PRESERVE existing data and add/update quiz responses
-                    current_data = profile_record.data if profile_record.data else {}
-                    current_data['profile_quiz'] = profile_data
-                    profile_record.update(current_data)
+                # Store the quiz under 'profile_quiz' in the profile section, preserving other keys
+                saved_data = MatchmakersData.upsert_index(user_id, 'profile', 'profile_quiz', profile_data)
 
                 return {
                     'message': f'Profile data saved for {uid}', 
-                    'data': profile_record.data
+                    'data': saved_data
                 }, 201
                 
             except ValueError as ve:
                 return {'message': f'Value error: {str(ve)}'}, 400
-            except Exception as e:
-                import traceback
-                traceback.print_exc()
-                return {'message': f'Error saving profile data: {str(e)}'}, 500
+            except SQLAlchemyError as e:
+                current_app.logger.exception("Database error in _SAVE_PROFILE_JSON: %s", e)
+                return {'message': 'Error saving profile data'}, 500
 
     # Register all resources
     api.add_resource(_DATA, '/data')
@@ -5,14 +5,16 @@ from flask import Blueprint, app, request, jsonify, current_app, Response, g, Fl
 from flask_restful import Api, Resource # used for REST API building
 from flask_cors import CORS
 from datetime import datetime
-from __init__ import app
+from __init__ import app, restful_output_json
 from api.jwt_authorize import token_required
 from model.user import User
 from model.matchmakers import MatchmakersData
 from model.database_audit import DatabaseStatus
 from model.github import GitHubUser
 import os
+import hashlib
 import json
+import orjson
 from functools import wraps
 
 matchmaking_api = Blueprint('matchmaking_api', __name__,
@@ -20,6 +22,7 @@ matchmaking_api = Blueprint('matchmaking_api', __name__,
 
 # API docs https://flask-restful.readthedocs.io/en/latest/api.html
 api = Api(matchmaking_api)
+api.representations['application/json'] = restful_output_json  # orjson instead of stdlib json
 
 
 def matchmakers_write_allowed():
@@ -27,9 +30,9 @@ def matchmakers_write_allowed():
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            status = DatabaseStatus.get_or_create()
-            if status.is_matchmakers_paused:
-                return {'message': f'Matchmakers data is currently paused. Reason: {status.matchmakers_pause_reason}'}, 403
+            status = DatabaseStatus.get_cached()
+            if status['is_matchmakers_paused']:
+                return {'message': f'Matchmakers data is currently paused. Reason: {status["matchmakers_pause_reason"]}'}, 403
             return f(*args, **kwargs)
         return decorated_function
     return decorator
@@ -94,22 +97,11 @@ class MatchmakingAPI:
                 return {'message': 'data field is required'}, 400
             
             try:
-                # Check if record exists
-                existing_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section=section)
-                
-                if existing_records:
-                    # Update existing
-                    record = existing_records[0]
-                    record.update(data)
-                    message = f'Data updated for section {section}'
-                else:
-                    # Create new
-                    record = MatchmakersData(current_user, section, data)
-                    record.create()
-                    message = f'Data created for section {section}'
+                # Insert or replace the section in one statement
+                MatchmakersData.upsert_section(current_user.id, section, data)
                 
                 return {
-                    'message': message,
+                    'message': f'Data saved for section {section}',
                     'section': section,
                     'data': data
                 }, 201
@@ -131,18 +123,16 @@ class MatchmakingAPI:
             current_user = g.current_user
 
             # Check if profile setup already exists
-            existing_records = MatchmakersData.get_user_matchmakers_data(current_user.id)
-            if existing_records:
+            if MatchmakersData.exists_for_user(current_user.id):
                 return {'message': f'Profile setup for {current_user.uid} already created'}, 409  # 409 Conflict
 
             # Create new profile setup record
             try:
                 setup_record = MatchmakersData(current_user, 'profile', {})
-                setup_record.create()
                 
                 return {
                     'message': f'Profile setup initialized for {current_user.uid}', 
-                    'data': setup_record.read()
+                    'data': setup_record.create_and_read()
                 }, 201
                     
             except Exception as e:
@@ -175,22 +165,8 @@ class MatchmakingAPI:
                 return {'message': 'data field is required'}, 400
             
             try:
-                # Get user's profile record
-                profile_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
-                
-                if not profile_records:
-                    # Create profile record if it doesn't exist
-                    profile_record = MatchmakersData(current_user, 'profile', {})
-                    profile_record.create()
-                else:
-                    profile_record = profile_records[0]
-                
-                # Update the data dict
-                current_data = profile_record.data if profile_record.data else {}
-                current_data[index] = data_value
-                
-                # Update the record
-                profile_record.update(current_data)
+                # Set the index on the user's profile record, creating it if needed, in one statement
+                MatchmakersData.upsert_index(current_user.id, 'profile', index, data_value)
                 
                 return {
                     'message': f'Data added to profile for {current_user.uid}',
@@ -230,7 +206,7 @@ class MatchmakingAPI:
                     return {'message': f'No profile setup found for {current_user.uid}'}, 404
                 
                 profile_record = profile_records[0]
-                current_data = profile_record.data if profile_record.data else {}
+                current_data = dict(profile_record.data) if profile_record.data else {}
                 
                 # Check if index exists
                 if index not in current_data:
@@ -239,11 +215,9 @@ class MatchmakingAPI:
                         'full_data': current_data
                     }, 404
                 
-                # Delete the indexed data
+                # Delete the indexed data in SQL; only the key goes over the wire
                 deleted_data = current_data.pop(index)
-                
-                # Update the record
-                profile_record.update(current_data)
+                MatchmakersData.remove_index(current_user.id, 'profile', index)
                 
                 return {
                     'message': f'Data at index "{index}" deleted for {current_user.uid}',
@@ -263,25 +237,27 @@ class MatchmakingAPI:
             NOTE: This endpoint is public to allow matchmaking without authentication.
             """
             try:
-                all_records = MatchmakersData.get_all_matchmakers_data()
-                
-                # Group by user
+                # Group by user: one lookup per record, the entry is seeded only on a user's first record.
+                # Records are streamed in batches, so only each record's data outlives its batch.
                 user_data = {}
-                for record in all_records:
-                    uid = record.user.uid if record.user else f"user_{record.user_id}"
-                    if uid not in user_data:
-                        user_data[uid] = {
-                            'id': record.user_id,
-                            'uid': uid,
-                            'data': {}
-                        }
-                    user_data[uid]['data'][record.section] = record.data
+                for record in MatchmakersData.iter_all_matchmakers_data():
+                    user, user_id = record.user, record.user_id
+                    uid = user.uid if user else f"user_{user_id}"
+                    entry = user_data.get(uid)
+                    if entry is None:
+                        entry = user_data[uid] = {'id': user_id, 'uid': uid, 'data': {}}
+                    entry['data'][record.section] = record.data
                 
-                return {
+                # Large payload: serialize once with orjson and bypass Flask-RESTful's output path
+                body = orjson.dumps({
                     'message': 'All profile data',
                     'total_users': len(user_data),
                     'users': list(user_data.values())
-                }, 200
+                })
+                response = Response(body, status=200, mimetype='application/json')
+                # Pollers that send If-None-Match get an empty 304 when nothing changed
+                response.set_etag(hashlib.md5(body).hexdigest())
+                return response.make_conditional(request)
             except Exception as e:
                 return {'message': f'Error retrieving all data: {str(e)}'}, 500
     
@@ -342,44 +318,12 @@ class MatchmakingAPI:
                 return {'message': 'No profile_data provided'}, 400
 
             try:
-                # Use MatchmakersData (DB) to store profile quiz under section 'profile'
-                profile_records = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
-                
-                print(f"DEBUG: Found {len(profile_records)} existing profile records for user {uid}")
-                print(f"DEBUG: User ID: {current_user.id}")
-
-                if not profile_records:
-                    # create a new profile record with the quiz data
-                    print(f"DEBUG: Creating new profile record for user {uid}")
-                    new_data = {'profile_quiz': profile_data}
-                    profile_record = MatchmakersData(current_user, 'profile', new_data)
-                    
-                    try:
-                        profile_record.create()
-                        print(f"DEBUG: Successfully created profile record")
-                    except Exception as create_error:
-                        print(f"DEBUG: Error in create(): {str(create_error)}")
-                        raise
-                else:
-                    # Update existing record
-                    print(f"DEBUG: Updating existing profile record for user {uid}")
-                    profile_record = profile_records[0]
-                    # PRESERVE existing data and add/update quiz responses
-                    current_data = profile_record.data if profile_record.data else {}
-                    print(f"DEBUG: Current data before update: {current_data}")
-                    current_data['profile_quiz'] = profile_data
-                    profile_record.update(current_data)
-                    print(f"DEBUG: Data after update: {profile_record.data}")
-
-                # Verify the save
-                verification = MatchmakersData.get_user_matchmakers_data(current_user.id, section='profile')
-                print(f"DEBUG: Verification - found {len(verification)} profile records after save")
-                if verification:
-                    print(f"DEBUG: Verification - data content: {verification[0].data}")
+                # Store the quiz under 'profile_quiz' in the profile section, preserving other keys
+                saved_data = MatchmakersData.upsert_index(current_user.id, 'profile', 'profile_quiz', profile_data)
 
                 return {
                     'message': f'Profile data saved for {uid}', 
-                    'data': profile_record.data
+                    'data': saved_data
                 }, 201
                 
             except ValueError as ve:
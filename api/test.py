@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request,  current_app
 from datetime import datetime
+import time
 from functools import wraps
 from model.user import User
 from __init__ import app
@@ -24,59 +25,72 @@ def require_api_key(f):
 def yor_mama():
     return jsonify("Joe Mama!")
 
-@test_api.route('/bell', methods=['GET'])
-@cross_origin() 
-def get_bell_schedule():
-    bell_schedule = {}
-
-    bell_schedule["Monday, Tuesday, Thursday, Friday"] = [
+# Bell schedule is fixed, so it is built and its times parsed once at import
+BELL_SCHEDULE = {
+    "Monday, Tuesday, Thursday, Friday": [
         {"time": "8:35 AM - 9:41 AM", "period": "1st Period"},
         {"time": "9:46 AM - 10:55 AM", "period": "2nd Period"},
         {"time": "11:37 AM - 12:43 PM", "period": "3rd Period"},
         {"time": "12:43 PM - 1:13 PM", "period": "Lunch"},
         {"time": "1:18 PM - 2:24 PM", "period": "4th Period"},
         {"time": "2:29 PM - 3:35 PM", "period": "5th Period"},
-    ]
-
-    bell_schedule["Wednesday"] = [
+    ],
+    "Wednesday": [
         {"time": "9:35 AM - 10:35 AM", "period": "1st Period"},
         {"time": "10:39 AM - 11:38 AM", "period": "2nd Period"},
         {"time": "11:53 AM - 12:57 PM", "period": "3rd Period"},
         {"time": "12:57 PM - 1:27 PM", "period": "Lunch"},
         {"time": "1:32 PM - 2:31 PM", "period": "4th Period"},
         {"time": "2:36 PM - 3:35 PM", "period": "5th Period"},
-    ]
+    ],
+}
+
+
+def parse_periods(periods):
+    """(start, end, period) tuples with the "8:35 AM - 9:41 AM" strings parsed to datetime.time"""
+    parsed = []
+    for period in periods:
+        start_str, end_str = period["time"].split(" - ")
+        start = datetime.strptime(start_str.strip(), "%I:%M %p").time()
+        end = datetime.strptime(end_str.strip(), "%I:%M %p").time()
+        parsed.append((start, end, period))
+    return parsed
+
 
+# Keyed by datetime.weekday(): Monday=0 ... Friday=4; weekends have no schedule
+WEEKDAY_PERIODS = parse_periods(BELL_SCHEDULE["Monday, Tuesday, Thursday, Friday"])
+PERIODS_BY_WEEKDAY = {
+    0: WEEKDAY_PERIODS,
+    1: WEEKDAY_PERIODS,
+    2: parse_periods(BELL_SCHEDULE["Wednesday"]),
+    3: WEEKDAY_PERIODS,
+    4: WEEKDAY_PERIODS,
+}
+
+
+@test_api.route('/bell', methods=['GET'])
+@cross_origin() 
+def get_bell_schedule():
     output = {
         "school": "DNHS",
-       ## "bell_schedule": bell_schedule,
-        "current_period": get_current_period(bell_schedule),
+       ## "bell_schedule": BELL_SCHEDULE,
+        "current_period": get_current_period(),
        ## "current_day": datetime.now().strftime("%A"),
-        "timestamp": datetime.now().strftime("%H:%M:%S")
+        "timestamp": time.strftime("%H:%M:%S")
     }
 
     return jsonify(output)
 
-def get_current_period(schedule):
+def get_current_period():
     now = datetime.now()
     current_time = now.time()
-    current_day = now.strftime("%A")
-
-    if current_day in ["Monday", "Tuesday", "Thursday", "Friday"]:
-        today_schedule = schedule["Monday, Tuesday, Thursday, Friday"]
-    elif current_day == "Wednesday":
-        today_schedule = schedule["Wednesday"]
-    else:
-        today_schedule = None  # weekend
+
+    today_schedule = PERIODS_BY_WEEKDAY.get(now.weekday())
     
     if not today_schedule:
         return "No schedule available for today"
     
-    for period in today_schedule:
-        start_str, end_str = period["time"].split(" - ")
-        start = datetime.strptime(start_str.strip(), "%I:%M %p").time()
-        end = datetime.strptime(end_str.strip(), "%I:%M %p").time()
-
+    for start, end, period in today_schedule:
         if start <= current_time <= end:
             # build full datetime for today’s end time
             end_dt = datetime.combine(now.date(), end)
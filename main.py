@@ -8,6 +8,7 @@ from flask_login import current_user, login_required
 from flask import current_app
 from werkzeug.security import generate_password_hash
 from dotenv import load_dotenv
+from sqlalchemy.orm import lazyload
 from api.jwt_authorize import token_required
 
 
@@ -110,7 +111,9 @@ def unauthorized_callback():
 # register URIs for server pages
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    # Runs on every authenticated request; skip the eager section/persona subqueries
+    # (lazy='subquery') since most requests only need the user row itself
+    return db.session.get(User, int(user_id), options=[lazyload(User.sections), lazyload(User.personas)])
 
 @app.context_processor
 def inject_user():
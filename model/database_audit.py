@@ -3,10 +3,16 @@ Database Audit and Monitoring Models
 
 This module provides models for tracking database activity, metrics, and logs.
 """
-from __init__ import db
+from __init__ import app, db
 from datetime import datetime, timedelta
-from sqlalchemy import desc
-import json
+from sqlalchemy import DateTime, Integer, desc, func, insert, literal, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+import atexit
+import orjson
+import queue
+import threading
+import time
 
 class DatabaseMetrics(db.Model):
     """
@@ -34,6 +40,11 @@ class DatabaseMetrics(db.Model):
     requests_today = db.Column(db.Integer, default=0)
     errors_today = db.Column(db.Integer, default=0)
     
+    # Columns in to_dict(), for list endpoints that select them without loading model instances
+    DICT_FIELDS = ('id', 'timestamp', 'total_users', 'active_users', 'total_records',
+        'total_posts', 'total_personas', 'total_matchmakers', 'database_size_mb', 'requests_today',
+        'errors_today')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -66,6 +77,9 @@ class ErrorLog(db.Model):
     request_data = db.Column(db.Text)  # JSON string
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
+    DICT_FIELDS = ('id', 'timestamp', 'error_type', 'endpoint', 'error_message', 'status_code',
+        'user_id')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -83,6 +97,10 @@ class FetchLog(db.Model):
     Tracks API fetch operations and their sources
     """
     __tablename__ = 'fetch_logs'
+    __table_args__ = (
+        # Serves the error_only filter on the newest-first fetch log listing
+        db.Index('ix_fetch_logs_is_error_timestamp', 'is_error', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -96,6 +114,9 @@ class FetchLog(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     is_error = db.Column(db.Boolean, default=False)
     
+    DICT_FIELDS = ('id', 'timestamp', 'endpoint', 'method', 'status_code', 'response_time_ms',
+        'source_ip', 'user_agent', 'user_id', 'is_error')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -116,6 +137,10 @@ class ChangeLog(db.Model):
     Tracks recent changes to data records
     """
     __tablename__ = 'change_logs'
+    __table_args__ = (
+        # Serves the entity_type filter on the newest-first change log listing
+        db.Index('ix_change_logs_entity_type_timestamp', 'entity_type', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -128,6 +153,8 @@ class ChangeLog(db.Model):
     new_values = db.Column(db.Text)  # JSON string of new data
     changed_by_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     
+    DICT_FIELDS = ('id', 'timestamp', 'entity_type', 'entity_id', 'action', 'changed_by_user_id')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -139,6 +166,15 @@ class ChangeLog(db.Model):
         }
 
 
+# In-process copy of the single DatabaseStatus row, refreshed on writes. Other gunicorn
+# workers can't see this worker's writes, so entries also expire after a short TTL.
+STATUS_MIRROR_TTL = 2  # seconds
+_status_mirror = {'value': None, 'expires_at': 0.0}
+_status_mirror_lock = threading.Lock()
+# Primary key of the DatabaseStatus row once found, so later lookups go through the identity map
+_status_id = None
+
+
 class DatabaseStatus(db.Model):
     """
     Tracks the current status of the database (idle, processing, paused, etc.)
@@ -158,7 +194,7 @@ class DatabaseStatus(db.Model):
         details_obj = {}
         if self.details:
             try:
-                details_obj = json.loads(self.details)
+                details_obj = orjson.loads(self.details)
             except:
                 details_obj = {'raw': self.details}
         
@@ -176,22 +212,48 @@ class DatabaseStatus(db.Model):
     @staticmethod
     def get_or_create():
         """Get the current database status or create one if it doesn't exist"""
+        global _status_id
+        if _status_id is not None:
+            status = db.session.get(DatabaseStatus, _status_id)
+            if status:
+                return status
+        # First lookup in this process, or the row was removed (e.g. a database reset)
         status = DatabaseStatus.query.first()
         if not status:
             status = DatabaseStatus()
             db.session.add(status)
             db.session.commit()
+        _status_id = status.id
         return status
     
+    @staticmethod
+    def mirror(status):
+        """Store a status row's dict in the in-process mirror"""
+        value = status.to_dict()
+        with _status_mirror_lock:
+            _status_mirror['value'] = value
+            _status_mirror['expires_at'] = time.monotonic() + STATUS_MIRROR_TTL
+        return value
+    
+    @staticmethod
+    def get_cached():
+        """Get the current database status as a dict, from the mirror when it is fresh"""
+        with _status_mirror_lock:
+            if _status_mirror['value'] is not None and time.monotonic() < _status_mirror['expires_at']:
+                return _status_mirror['value']
+        return DatabaseStatus.mirror(DatabaseStatus.get_or_create())
+    
     @staticmethod
     def set_status(new_status, details=None):
         """Update the database status"""
         status = DatabaseStatus.get_or_create()
         status.status = new_status
         if details:
-            status.details = json.dumps(details)
+            status.details = orjson.dumps(details).decode()  # Text column takes str
         status.last_updated = datetime.utcnow()
         db.session.commit()
+        DatabaseStatus.mirror(status)
+        clear_database_metrics_cache()
         return status
     
     @staticmethod
@@ -203,6 +265,7 @@ class DatabaseStatus(db.Model):
         status.status = 'paused'
         status.last_updated = datetime.utcnow()
         db.session.commit()
+        DatabaseStatus.mirror(status)
         return status
     
     @staticmethod
@@ -214,6 +277,35 @@ class DatabaseStatus(db.Model):
         status.status = 'idle'
         status.last_updated = datetime.utcnow()
         db.session.commit()
+        DatabaseStatus.mirror(status)
+        return status
+    
+    @staticmethod
+    def pause_all(reason="User initiated pause"):
+        """Pause incoming and matchmakers data together in one UPDATE"""
+        status = DatabaseStatus.get_or_create()
+        status.is_paused = True
+        status.pause_reason = reason
+        status.is_matchmakers_paused = True
+        status.matchmakers_pause_reason = reason
+        status.status = 'paused'
+        status.last_updated = datetime.utcnow()
+        db.session.commit()
+        DatabaseStatus.mirror(status)
+        return status
+    
+    @staticmethod
+    def resume_all():
+        """Resume incoming and matchmakers data together in one UPDATE"""
+        status = DatabaseStatus.get_or_create()
+        status.is_paused = False
+        status.pause_reason = None
+        status.is_matchmakers_paused = False
+        status.matchmakers_pause_reason = None
+        status.status = 'idle'
+        status.last_updated = datetime.utcnow()
+        db.session.commit()
+        DatabaseStatus.mirror(status)
         return status
     
     @staticmethod
@@ -224,6 +316,7 @@ class DatabaseStatus(db.Model):
         status.matchmakers_pause_reason = reason
         status.last_updated = datetime.utcnow()
         db.session.commit()
+        DatabaseStatus.mirror(status)
         return status
     
     @staticmethod
@@ -234,43 +327,224 @@ class DatabaseStatus(db.Model):
         status.matchmakers_pause_reason = None
         status.last_updated = datetime.utcnow()
         db.session.commit()
+        DatabaseStatus.mirror(status)
         return status
 
 
+class AuditLogWriter:
+    """
+    Buffers audit rows (ErrorLog, FetchLog, ChangeLog) in memory and writes them
+    in batches from a background thread, so logging endpoints don't commit per row.
+    Rows are flushed every flush_interval seconds or once batch_size rows are waiting.
+    """
+    
+    def __init__(self, flush_interval=0.2, batch_size=500):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+    
+    def enqueue(self, model, row):
+        """Queue a row (dict of column values) for the given audit model"""
+        row.setdefault('timestamp', datetime.utcnow())
+        self._queue.put_nowait((model, row))
+        self._ensure_started()
+    
+    def write(self, model, row):
+        """Insert a row in the caller's session and commit now, bypassing the queue"""
+        row.setdefault('timestamp', datetime.utcnow())
+        db.session.execute(insert(model.__table__), [row])
+        db.session.commit()
+    
+    def _ensure_started(self):
+        # Started lazily so each gunicorn worker gets its own thread after fork
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+                self._thread.start()
+    
+    def _next_batch(self):
+        """Block for the first row, then collect more until the batch is full or the interval passes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+    
+    def _write(self, batch):
+        rows_by_model = {}
+        for model, row in batch:
+            rows_by_model.setdefault(model, []).append(row)
+        
+        with app.app_context():
+            # One retry covers a dropped connection or a lock timeout; a batch failing twice is dropped
+            for attempt in (1, 2):
+                try:
+                    # Table-level (Core) inserts skip the ORM bulk path's per-row mapper processing
+                    for model, rows in rows_by_model.items():
+                        db.session.execute(insert(model.__table__), rows)
+                    db.session.commit()
+                    return
+                except Exception:
+                    db.session.rollback()
+                    if attempt == 1:
+                        app.logger.warning("Audit log writer failed to write %d rows, retrying", len(batch), exc_info=True)
+                    else:
+                        counts = ', '.join(f"{len(rows)} {model.__tablename__}" for model, rows in rows_by_model.items())
+                        app.logger.exception("Audit log writer dropped %d rows (%s)", len(batch), counts)
+    
+    def _run(self):
+        while True:
+            self._write(self._next_batch())
+    
+    def flush(self):
+        """Write any queued rows immediately (used at shutdown)"""
+        batch = self._drain()
+        if batch:
+            self._write(batch)
+
+
+audit_log_writer = AuditLogWriter()
+atexit.register(audit_log_writer.flush)
+
+
+class utc_hours_ago(FunctionElement):
+    """
+    The UTC timestamp `hours` before now, computed by the database rather than the app server.
+    Audit timestamps are stored as naive UTC (datetime.utcnow), so each dialect compares against UTC.
+    """
+    type = DateTime()
+    name = 'utc_hours_ago'
+    inherit_cache = True
+    
+    def __init__(self, hours):
+        super().__init__(literal(hours, Integer))
+
+
+@compiles(utc_hours_ago)
+def _utc_hours_ago_default(element, compiler, **kw):
+    return "(timezone('utc', now()) - make_interval(hours => %s))" % compiler.process(element.clauses, **kw)
+
+
+@compiles(utc_hours_ago, 'mysql')
+def _utc_hours_ago_mysql(element, compiler, **kw):
+    return "(UTC_TIMESTAMP() - INTERVAL %s HOUR)" % compiler.process(element.clauses, **kw)
+
+
+@compiles(utc_hours_ago, 'sqlite')
+def _utc_hours_ago_sqlite(element, compiler, **kw):
+    return "datetime('now', '-' || %s || ' hours')" % compiler.process(element.clauses, **kw)
+
+
+class utc_now(FunctionElement):
+    """The current UTC timestamp as the database sees it, for naive UTC DateTime column defaults"""
+    type = DateTime()
+    name = 'utc_now'
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+@compiles(utc_now, 'mysql')
+def _utc_now_mysql(element, compiler, **kw):
+    return "UTC_TIMESTAMP()"
+
+
+@compiles(utc_now, 'sqlite')
+def _utc_now_sqlite(element, compiler, **kw):
+    return "datetime('now')"
+
+
+def get_activity_counts(since):
+    """Count errors and fetches logged since a cutoff in a single round-trip"""
+    error_count = select(func.count(ErrorLog.id)).where(ErrorLog.timestamp >= since).scalar_subquery()
+    fetch_count = select(func.count(FetchLog.id)).where(FetchLog.timestamp >= since).scalar_subquery()
+    row = db.session.execute(select(error_count.label('errors'), fetch_count.label('fetches'))).one()
+    return row.errors, row.fetches
+
+
+# Table counts only drift slowly, so each worker reuses its last result for a short while
+METRICS_CACHE_TTL = 45  # seconds
+_metrics_cache = {'value': None, 'expires_at': 0.0}
+_metrics_cache_lock = threading.Lock()
+
+
+def clear_database_metrics_cache():
+    """Drop the cached table counts so the next call recounts"""
+    with _metrics_cache_lock:
+        _metrics_cache['value'] = None
+
+
 def get_database_metrics():
-    """Get current database metrics"""
-    try:
+    """Get current database metrics, from the in-process cache when it is fresh"""
+    with _metrics_cache_lock:
+        if _metrics_cache['value'] is not None and time.monotonic() < _metrics_cache['expires_at']:
+            return dict(_metrics_cache['value'])
+    
+    metrics = count_database_metrics()
+    if 'error' not in metrics:
+        with _metrics_cache_lock:
+            _metrics_cache['value'] = metrics
+            _metrics_cache['expires_at'] = time.monotonic() + METRICS_CACHE_TTL
+    return dict(metrics)
+
+
+_metrics_counts_stmt = None
+
+
+def metrics_counts_statement():
+    """
+    The SELECT of one scalar COUNT subquery per metrics table, built on first use and reused.
+    The models are imported here rather than at module level since model.matchmakers imports this module.
+    """
+    global _metrics_counts_stmt
+    if _metrics_counts_stmt is None:
         from model.user import User
+        from model.post import Post
+        from model.persona import Persona
+        from model.matchmakers import MatchmakersData
         
-        metrics = {
-            'total_users': User.query.count(),
-            'active_users': User.query.filter_by(active=True).count() if hasattr(User, 'active') else 0,
-            'total_posts': 0,
-            'total_personas': 0,
-            'total_matchmakers': 0,
-            'timestamp': datetime.utcnow().isoformat(),
+        counts = {
+            'total_users': select(func.count(User.id)),
+            'total_posts': select(func.count(Post.id)),
+            'total_personas': select(func.count(Persona.id)),
+            'total_matchmakers': select(func.count(MatchmakersData.id)),
         }
+        if 'active' in User.__table__.c:
+            counts['active_users'] = select(func.count(User.id)).where(User.active == True)
         
-        # Try to get Post count
-        try:
-            from model.post import Post
-            metrics['total_posts'] = Post.query.count()
-        except:
-            pass
-        
-        # Try to get Persona count
-        try:
-            from model.persona import Persona
-            metrics['total_personas'] = Persona.query.count()
-        except:
-            pass
+        _metrics_counts_stmt = select(*(count.scalar_subquery().label(key) for key, count in counts.items()))
+    return _metrics_counts_stmt
+
+
+def count_database_metrics():
+    """Count every metrics table in a single round-trip"""
+    try:
+        row = db.session.execute(metrics_counts_statement()).one()
         
-        # Try to get MatchmakersData count
-        try:
-            from model.matchmakers import MatchmakersData
-            metrics['total_matchmakers'] = MatchmakersData.query.count()
-        except:
-            pass
+        metrics = dict(row._mapping)
+        metrics.setdefault('active_users', 0)
+        metrics['timestamp'] = datetime.utcnow().isoformat()
         
         # Total records is sum of all
         metrics['total_records'] = (metrics['total_posts'] + 
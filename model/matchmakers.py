@@ -2,20 +2,31 @@ from flask import render_template, request, jsonify
 from flask_login import login_required, current_user
 from __init__ import app, db
 from model.user import User
-import json
-from sqlalchemy import JSON
-from sqlalchemy.orm import validates
+import orjson
+from sqlalchemy import JSON, case, cast, event, func, insert, inspect, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload, validates
 from sqlalchemy.exc import IntegrityError
+from model.database_audit import utc_now
 from datetime import datetime, timezone
 
 # Route to display the matchmakers data management page
 @app.route('/matchmakers/', methods=['GET'])
 @login_required
 def matchmakers_page():
-    """Display the matchmakers data management page."""
-    matchmakers_records = MatchmakersData.query.all()
+    """Display the matchmakers data management page, one page of records at a time."""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 100, type=int)
+    # The template shows each record's user uid; load users in the same query (without their sections/personas)
+    user_load = joinedload(MatchmakersData.user)
+    pagination = MatchmakersData.query.options(
+        user_load.lazyload(User.sections), user_load.lazyload(User.personas)
+    ).order_by(MatchmakersData.id).paginate(
+        page=page, per_page=per_page, max_per_page=500, error_out=False
+    )
     return render_template('matchmakers.html', 
-                         matchmakers_records=matchmakers_records,
+                         matchmakers_records=pagination.items,
+                         pagination=pagination,
                          current_user=current_user)
 
 # Route to get a specific matchmakers data record by ID
@@ -23,9 +34,10 @@ def matchmakers_page():
 @login_required
 def get_matchmaker_record(id):
     """Get a specific matchmakers data record by ID."""
+    # Looked up outside the try so a missing id stays a 404 rather than a 500
+    record = MatchmakersData.query.get_or_404(id)
+
     try:
-        record = MatchmakersData.query.get_or_404(id)
-        
         # Get user uid
         user_uid = ''
         if record.user:
@@ -36,7 +48,7 @@ def get_matchmaker_record(id):
             'user_id': record.user_id,
             'user_uid': user_uid,
             'section': record.section,
-            'data': json.dumps(record.data, indent=2) if isinstance(record.data, dict) else record.data,
+            'data': orjson.dumps(record.data, option=orjson.OPT_INDENT_2).decode() if isinstance(record.data, dict) else record.data,
             'created_at': record.created_at.isoformat() if record.created_at else None,
             'updated_at': record.updated_at.isoformat() if record.updated_at else None
         }), 200
@@ -53,9 +65,9 @@ def update_matchmaker_record(id):
     if current_user.role != 'Admin':
         return jsonify({'message': 'Unauthorized'}), 403
     
+    record = MatchmakersData.query.get_or_404(id)
+
     try:
-        record = MatchmakersData.query.get_or_404(id)
-        
         # Get data from request
         request_data = request.get_json()
         if not request_data or 'data' not in request_data:
@@ -83,9 +95,9 @@ def delete_matchmaker_record(id):
     if current_user.role != 'Admin':
         return jsonify({'message': 'Unauthorized'}), 403
     
+    record = MatchmakersData.query.get_or_404(id)
+
     try:
-        record = MatchmakersData.query.get_or_404(id)
-        
         # Delete the record
         db.session.delete(record)
         db.session.commit()
@@ -148,6 +160,43 @@ PII_SECTIONS = [
     'security',     # Security-related PII for verification
     'profile'       # Profile setup and general profile data
 ]
+PII_SECTION_SET = frozenset(PII_SECTIONS)  # for membership checks on every write
+PII_SECTIONS_TEXT = ', '.join(PII_SECTIONS)  # for validation error messages
+
+UPSERT_INDEX_NAME = 'uq_matchmakers_user_section'
+
+# Bumped whenever matchmakers data changes in this process; readers use it to key caches
+data_version = 0
+
+
+def bump_data_version():
+    global data_version
+    data_version += 1
+
+
+# Per engine: whether matchmakers_data has the unique index the upserts use as their conflict target
+_upsert_index_present = {}
+
+
+def upsert_index_present():
+    """
+    Whether uq_matchmakers_user_section exists, checked once per engine. Tables created before the
+    index was added only get it from scripts/add_matchmakers_unique_index.py, and without it
+    ON DUPLICATE KEY UPDATE would silently insert duplicate records.
+    """
+    engine = db.session.get_bind()
+    present = _upsert_index_present.get(engine)
+    if present is None:
+        indexes = inspect(engine).get_indexes(MatchmakersData.__tablename__)
+        present = any(index['name'] == UPSERT_INDEX_NAME and index['unique'] for index in indexes)
+        if not present:
+            app.logger.error(
+                "matchmakers_data has no %s index; upserts fall back to read-modify-write. "
+                "Run scripts/add_matchmakers_unique_index.py and restart.", UPSERT_INDEX_NAME
+            )
+        _upsert_index_present[engine] = present
+    return present
+
 
 class MatchmakersData(db.Model):
     """
@@ -165,14 +214,18 @@ class MatchmakersData(db.Model):
         updated_at (Column): When the PII data was last updated
     """
     __tablename__ = 'matchmakers_data'
+    __table_args__ = (
+        # One record per user and section; also the conflict target for upserts
+        db.Index(UPSERT_INDEX_NAME, 'user_id', 'section', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     section = db.Column(db.String(32), nullable=False)
-    data = db.Column(db.JSON, nullable=False)  # Stores PII data as JSON object
-    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), 
-                          onupdate=lambda: datetime.now(timezone.utc))
+    data = db.Column(db.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False)  # Stores PII data as JSON object (jsonb on Postgres)
+    # Timestamps are rendered into the INSERT/UPDATE and evaluated by the database (naive UTC)
+    created_at = db.Column(db.DateTime, default=utc_now())
+    updated_at = db.Column(db.DateTime, default=utc_now(), onupdate=utc_now())
     
     # Relationship to User model
     user = db.relationship("User", backref=db.backref("matchmakers_data_records", cascade="all, delete-orphan"))
@@ -181,14 +234,12 @@ class MatchmakersData(db.Model):
         self.user = user
         self.section = section
         self.data = data
-        self.created_at = datetime.now(timezone.utc)
-        self.updated_at = datetime.now(timezone.utc)
     
     @validates('section')
     def validate_section(self, key, value):
         """Validate that the section is one of the allowed PII sections."""
-        if value not in PII_SECTIONS:
-            raise ValueError(f"Invalid PII section '{value}'. Must be one of: {', '.join(PII_SECTIONS)}")
+        if value not in PII_SECTION_SET:
+            raise ValueError(f"Invalid PII section '{value}'. Must be one of: {PII_SECTIONS_TEXT}")
         return value
     
     def create(self):
@@ -201,12 +252,23 @@ class MatchmakersData(db.Model):
             db.session.rollback()
             raise ValueError(f"Matchmakers data record for user {self.user_id} and section '{self.section}' already exists")
     
+    def create_and_read(self):
+        """Create a new matchmakers data record and return its read() dict, built before the commit expires it."""
+        try:
+            db.session.add(self)
+            db.session.flush()  # assigns the id
+            record = self.read()
+            db.session.commit()
+            return record
+        except IntegrityError:
+            db.session.rollback()
+            raise ValueError(f"Matchmakers data record for user {self.user_id} and section '{self.section}' already exists")
+    
     def update(self, data):
         """Update existing PII data."""
         from sqlalchemy.orm.attributes import flag_modified
         
         self.data = data
-        self.updated_at = datetime.now(timezone.utc)
         
         # Mark the JSON column as modified so SQLAlchemy knows to update it
         flag_modified(self, 'data')
@@ -226,6 +288,132 @@ class MatchmakersData(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
     
+    @staticmethod
+    def _upsert(user_id, section, insert_data, update_data):
+        """
+        Statement inserting a (user_id, section) record, or updating its data if one exists.
+        update_data is given the dialect's insert construct and returns the new data expression.
+        Returns None when the database dialect has no upsert support here, or the table lacks the
+        unique index the upsert conflicts on.
+        """
+        if section not in PII_SECTION_SET:
+            raise ValueError(f"Invalid PII section '{section}'. Must be one of: {PII_SECTIONS_TEXT}")
+        
+        values = dict(user_id=user_id, section=section, data=insert_data)
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('mysql', 'sqlite', 'postgresql') and not upsert_index_present():
+            return None
+        
+        if dialect == 'mysql':
+            stmt = mysql.insert(MatchmakersData).values(**values)
+            return stmt.on_duplicate_key_update(data=update_data(stmt), updated_at=utc_now())
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            stmt = insert(MatchmakersData).values(**values)
+            return stmt.on_conflict_do_update(
+                index_elements=['user_id', 'section'],
+                set_={'data': update_data(stmt), 'updated_at': utc_now()}
+            )
+        return None
+    
+    @staticmethod
+    def _execute_upsert(stmt):
+        db.session.execute(stmt)
+        db.session.commit()
+        bump_data_version()
+    
+    @staticmethod
+    def upsert_section(user_id, section, data):
+        """Create or replace the data for one of the user's sections."""
+        def replace(stmt):
+            return stmt.inserted.data if isinstance(stmt, mysql.Insert) else stmt.excluded.data
+        
+        stmt = MatchmakersData._upsert(user_id, section, data, replace)
+        if stmt is not None:
+            MatchmakersData._execute_upsert(stmt)
+            return
+        
+        records = MatchmakersData.get_user_matchmakers_data(user_id, section=section)
+        if records:
+            records[0].update(data)
+        else:
+            MatchmakersData(db.session.get(User, user_id), section, data).create()
+    
+    @staticmethod
+    def upsert_index(user_id, section, index, value):
+        """
+        Set one top-level key in a section's data, creating the record if needed, without reading it
+        first. Returns the section's resulting data.
+        """
+        column = MatchmakersData.__table__.c.data
+        value_json = orjson.dumps(value).decode()
+        dialect = db.session.get_bind().dialect.name
+        
+        def set_key(stmt):
+            if dialect == 'postgresql':
+                return cast(column, postgresql.JSONB).op('||', return_type=postgresql.JSONB)(
+                    func.jsonb_build_object(index, cast(value_json, postgresql.JSONB))
+                )
+            path = f'$."{index}"'
+            if dialect == 'mysql':
+                return func.JSON_SET(column, path, func.JSON_EXTRACT(value_json, '$'))
+            return func.json_set(column, path, func.json(value_json))
+        
+        # JSON path keys can't carry quotes or backslashes portably, so those use read-modify-write
+        stmt = None if '"' in index or '\\' in index else MatchmakersData._upsert(user_id, section, {index: value}, set_key)
+        if stmt is not None:
+            if db.session.get_bind().dialect.insert_returning:
+                data = db.session.execute(stmt.returning(MatchmakersData.data)).scalar_one()
+            else:
+                # MySQL has no INSERT ... RETURNING; read back just the data column
+                db.session.execute(stmt)
+                data = db.session.execute(
+                    select(MatchmakersData.data)
+                    .where(MatchmakersData.user_id == user_id, MatchmakersData.section == section)
+                ).scalar_one()
+            db.session.commit()
+            bump_data_version()
+            return data
+        
+        records = MatchmakersData.get_user_matchmakers_data(user_id, section=section)
+        if records:
+            current_data = dict(records[0].data or {})
+            current_data[index] = value
+            records[0].update(current_data)
+            return current_data
+        MatchmakersData(db.session.get(User, user_id), section, {index: value}).create()
+        return {index: value}
+    
+    @staticmethod
+    def remove_index(user_id, section, index):
+        """Delete one top-level key from a section's data in SQL, without writing the rest of it back."""
+        column = MatchmakersData.__table__.c.data
+        dialect = db.session.get_bind().dialect.name
+        path = f'$."{index}"'
+        if dialect == 'postgresql':
+            remaining = cast(column, postgresql.JSONB).op('-', return_type=postgresql.JSONB)(index)
+        elif dialect == 'mysql':
+            remaining = func.JSON_REMOVE(column, path)
+        else:
+            remaining = func.json_remove(column, path)
+        
+        if '"' in index or '\\' in index or dialect not in ('sqlite', 'mysql', 'postgresql'):
+            records = MatchmakersData.get_user_matchmakers_data(user_id, section=section)
+            if records:
+                current_data = dict(records[0].data or {})
+                current_data.pop(index, None)
+                records[0].update(current_data)
+            return
+        
+        stmt = (
+            update(MatchmakersData)
+            .where(MatchmakersData.user_id == user_id, MatchmakersData.section == section)
+            .values(data=remaining)
+        )
+        db.session.execute(stmt)
+        db.session.commit()
+        bump_data_version()
+    
     @staticmethod
     def get_user_matchmakers_data(user_id, section=None):
         """Get matchmakers data for a user, optionally filtered by section."""
@@ -234,13 +422,216 @@ class MatchmakersData(db.Model):
             query = query.filter_by(section=section)
         return query.all()
     
+    @staticmethod
+    def exists_for_user(user_id):
+        """Whether the user has any matchmakers data, answered by the database without loading rows."""
+        stmt = select(select(MatchmakersData.id).where(MatchmakersData.user_id == user_id).exists())
+        return db.session.execute(stmt).scalar()
+    
+    @staticmethod
+    def _sections_object():
+        """The dialect's aggregate building a {section: data} JSON object per group, or None if unsupported."""
+        dialect = db.session.get_bind().dialect.name
+        section, data = MatchmakersData.section, MatchmakersData.data
+        if dialect == 'sqlite':
+            return func.json_group_object(section, func.json(data), type_=JSON)
+        if dialect == 'mysql':
+            return func.JSON_OBJECTAGG(section, data, type_=JSON)
+        if dialect == 'postgresql':
+            return func.json_object_agg(section, data, type_=JSON)
+        return None
+    
+    @staticmethod
+    def get_user_sections_aggregated(user_id):
+        """Get all of a user's sections as one {section: data} dict, aggregated by the database."""
+        aggregate = MatchmakersData._sections_object()
+        if aggregate is None:
+            records = MatchmakersData.get_user_matchmakers_data(user_id)
+            return {record.section: record.data for record in records}
+        
+        stmt = select(aggregate).where(MatchmakersData.user_id == user_id)
+        return db.session.execute(stmt).scalar() or {}
+    
+    @staticmethod
+    def get_all_grouped():
+        """
+        One (user_id, uid, {section: data}) row per user with matchmakers data, ordered by user_id.
+        The grouping is done by the database; uid is None for records whose user no longer exists.
+        """
+        aggregate = MatchmakersData._sections_object()
+        if aggregate is None:
+            grouped = {}
+            for record in MatchmakersData.iter_all_matchmakers_data():
+                row = grouped.get(record.user_id)
+                if row is None:
+                    row = grouped[record.user_id] = (record.user_id, record.user.uid if record.user else None, {})
+                row[2][record.section] = record.data
+            return list(grouped.values())
+        
+        stmt = (
+            select(MatchmakersData.user_id, User._uid, aggregate)
+            .outerjoin(User, User.id == MatchmakersData.user_id)
+            .group_by(MatchmakersData.user_id, User._uid)
+            .order_by(MatchmakersData.user_id)
+        )
+        return db.session.execute(stmt).all()
+    
     @staticmethod
     def get_all_matchmakers_data():
-        """Get all matchmakers data records."""
-        return MatchmakersData.query.all()
+        """Get all matchmakers data records, with their users loaded in the same query."""
+        # The user's eager (lazy='subquery') sections/personas aren't needed by callers
+        user_load = joinedload(MatchmakersData.user)
+        return MatchmakersData.query.options(
+            user_load.lazyload(User.sections), user_load.lazyload(User.personas)
+        ).all()
+    
+    @staticmethod
+    def iter_all_matchmakers_data(batch_size=500):
+        """Stream all matchmakers data records ordered by user, batch_size rows at a time, users joined in."""
+        user_load = joinedload(MatchmakersData.user)
+        return MatchmakersData.query.options(
+            user_load.lazyload(User.sections), user_load.lazyload(User.personas)
+        ).order_by(MatchmakersData.user_id).yield_per(batch_size)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_matchmakers_changes(session, flush_context):
+    """Bump the data version when any ORM flush touches MatchmakersData (including cascaded deletes)"""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MatchmakersData):
+            bump_data_version()
+            return
 
 
 # Database initialization function
+# Sample values for initMatchmakersData; each seeded user picks entries by index
+SEED_COLORS = ("Blue", "Green", "Red", "Purple", "Yellow", "Orange", "Teal", "Pink", "Indigo", "Gray")
+SEED_ANIMALS = ("Birds", "Cats", "Dogs", "Dolphins", "Foxes", "Wolves", "Owls", "Turtles", "Horses", "Otters")
+SEED_GENRES = ("Pop", "Rock", "Hip Hop", "Jazz", "Classical", "EDM", "Indie", "R&B", "Country", "Lo-fi")
+SEED_ARTISTS = ("Michael Jackson", "Taylor Swift", "Adele", "Drake", "Coldplay", "BTS", "Billie Eilish", "Bruno Mars", "The Weeknd", "Daft Punk")
+SEED_SUBJECTS = ("English", "Math", "Science", "History", "Computer Science", "Art", "Music", "PE", "Economics", "Biology")
+
+SEED_PROFESSIONS = ("entrepreneur", "student", "designer", "developer", "researcher", "writer", "artist", "mentor", "builder", "analyst")
+SEED_ABOUT_HOBBIES_1 = ("building things", "reading", "coding", "sketching", "music", "sports", "robotics", "gaming", "cooking", "traveling")
+SEED_ABOUT_HOBBIES_2 = ("trying new experiences", "learning languages", "making videos", "designing apps", "volunteering", "photography", "debate", "hiking", "drawing", "tinkering")
+SEED_ACTIVITIES = ("exploring new ideas", "working on projects", "collaborating", "brainstorming", "helping others", "testing prototypes", "researching", "planning", "iterating", "presenting")
+SEED_VALUES = ("making an impact", "creativity", "growth", "teamwork", "curiosity", "excellence", "community", "balance", "innovation", "integrity")
+
+SEED_INTEREST_H1 = ("drawing", "cycling", "playing board games", "baking", "filmmaking", "coding", "reading", "sports", "music", "3D printing")
+SEED_INTEREST_H2 = ("photography", "skateboarding", "puzzles", "writing", "gardening", "design", "volunteering", "gaming", "yoga", "robotics")
+SEED_INTEREST_H3 = ("chess", "running", "painting", "blogging", "travel", "swimming", "crafts", "podcasts", "DIY", "science fairs")
+SEED_TOPICS = ("philosophy", "technology", "psychology", "history", "entrepreneurship", "science", "music", "design", "sports", "nature")
+
+SEED_SKILL1 = ("project management", "leadership", "time management", "public speaking", "problem solving", "team coordination", "analysis", "writing", "debugging", "design")
+SEED_SKILL2 = ("communication", "creativity", "organization", "research", "collaboration", "testing", "mentoring", "data literacy", "UI/UX", "strategy")
+SEED_SKILL3 = ("adaptability", "empathy", "focus", "planning", "prototyping", "iteration", "documentation", "presentation", "modeling", "optimization")
+SEED_EXPERIENCE = ("1-2 years", "2-3 years", "3-4 years", "4-5 years", "5+ years")
+SEED_ASPECTS = ("learning new techniques", "leading teams", "building prototypes", "sharing ideas", "experimenting", "mentoring others", "iterating quickly", "solving puzzles", "shipping features", "reflecting on outcomes")
+
+SEED_GOAL_INTERESTS = ("web development", "app development", "robotics", "data science", "game design", "AI", "cybersecurity", "product design", "music production", "entrepreneurship")
+SEED_GOALS = ("collaborate on open-source projects", "build a portfolio", "launch a side project", "teach others", "win a hackathon", "publish research", "start a club", "create a startup", "improve skills", "ship an app")
+SEED_GOAL_ACTIVITIES = ("work on coding projects together", "pair program regularly", "share ideas", "review designs", "prototype quickly", "study together", "test products", "practice presentations", "brainstorm features", "co-write docs")
+
+# MBTI personality types for personality_quiz
+SEED_MBTI_TYPES = ("E_high", "E_moderate", "I_high", "I_moderate")
+SEED_MBTI_FEELING = ("F_high", "F_moderate", "T_high", "T_moderate")
+SEED_MBTI_PERCEPTION = ("J_high", "J_moderate", "P_high", "P_moderate")
+SEED_MBTI_SENSING = ("S_high", "S_moderate", "N_high", "N_moderate")
+
+SEED_PERSONALITY_TRAITS = ("Extroverted", "Introverted")
+SEED_DECISION_TRAITS = ("Empathetic", "Logical")
+SEED_LIFESTYLE_TRAITS = ("Structured", "Spontaneous")
+
+SEED_FOCUS_AREAS = ("communication", "problem solving", "creativity", "leadership", "analysis")
+SEED_DEPTHS = ("shallow", "moderate", "deep")
+
+
+def _seed_profile_quiz(idx):
+    """Sample profile_quiz answers and analysis for the idx-th seeded user"""
+    return {
+        "personality_quiz": {
+            "1": SEED_MBTI_TYPES[idx % len(SEED_MBTI_TYPES)],
+            "2": SEED_MBTI_FEELING[idx % len(SEED_MBTI_FEELING)],
+            "3": SEED_MBTI_PERCEPTION[idx % len(SEED_MBTI_PERCEPTION)],
+            "4": SEED_MBTI_SENSING[idx % len(SEED_MBTI_SENSING)],
+            "5": SEED_MBTI_SENSING[(idx + 1) % len(SEED_MBTI_SENSING)],
+            "6": SEED_MBTI_TYPES[(idx + 1) % len(SEED_MBTI_TYPES)],
+            "7": SEED_MBTI_FEELING[(idx + 1) % len(SEED_MBTI_FEELING)],
+            "8": SEED_MBTI_SENSING[(idx + 2) % len(SEED_MBTI_SENSING)],
+            "9": SEED_MBTI_SENSING[(idx + 3) % len(SEED_MBTI_SENSING)],
+            "10": SEED_MBTI_SENSING[(idx + 4) % len(SEED_MBTI_SENSING)],
+            "11": SEED_MBTI_FEELING[(idx + 2) % len(SEED_MBTI_FEELING)],
+            "12": SEED_MBTI_FEELING[(idx + 3) % len(SEED_MBTI_FEELING)],
+            "13": SEED_MBTI_FEELING[(idx + 4) % len(SEED_MBTI_FEELING)]
+        },
+        "analysis": {
+            "focus": SEED_FOCUS_AREAS[idx % len(SEED_FOCUS_AREAS)],
+            "depth": SEED_DEPTHS[idx % len(SEED_DEPTHS)],
+            "personalityTraits": {
+                "social": SEED_PERSONALITY_TRAITS[idx % len(SEED_PERSONALITY_TRAITS)],
+                "decision": SEED_DECISION_TRAITS[idx % len(SEED_DECISION_TRAITS)],
+                "lifestyle": SEED_LIFESTYLE_TRAITS[idx % len(SEED_LIFESTYLE_TRAITS)],
+                "socialScore": 0,
+                "introversionScore": 0,
+                "thinkingScore": 0,
+                "feelingScore": 0
+            },
+            "profileInsights": [
+                {
+                    "category": "Color Preference",
+                    "value": SEED_COLORS[idx % len(SEED_COLORS)]
+                },
+                {
+                    "category": "Animal Preference",
+                    "value": SEED_ANIMALS[idx % len(SEED_ANIMALS)]
+                },
+                {
+                    "category": "Music Taste",
+                    "value": SEED_GENRES[idx % len(SEED_GENRES)]
+                },
+                {
+                    "category": "Academic Interest",
+                    "value": SEED_SUBJECTS[idx % len(SEED_SUBJECTS)]
+                }
+            ]
+        }
+    }
+
+
+def _seed_bio(idx, last_updated):
+    """Sample bio for the idx-th seeded user"""
+    return {
+        "about": {
+            "profession": SEED_PROFESSIONS[idx % len(SEED_PROFESSIONS)],
+            "hobby1": SEED_ABOUT_HOBBIES_1[idx % len(SEED_ABOUT_HOBBIES_1)],
+            "hobby2": SEED_ABOUT_HOBBIES_2[idx % len(SEED_ABOUT_HOBBIES_2)],
+            "activity": SEED_ACTIVITIES[idx % len(SEED_ACTIVITIES)],
+            "value": SEED_VALUES[idx % len(SEED_VALUES)]
+        },
+        "interests": {
+            "hobby1": SEED_INTEREST_H1[idx % len(SEED_INTEREST_H1)],
+            "hobby2": SEED_INTEREST_H2[idx % len(SEED_INTEREST_H2)],
+            "hobby3": SEED_INTEREST_H3[idx % len(SEED_INTEREST_H3)],
+            "topic": SEED_TOPICS[idx % len(SEED_TOPICS)]
+        },
+        "skills": {
+            "skill1": SEED_SKILL1[idx % len(SEED_SKILL1)],
+            "skill2": SEED_SKILL2[idx % len(SEED_SKILL2)],
+            "skill3": SEED_SKILL3[idx % len(SEED_SKILL3)],
+            "experience": SEED_EXPERIENCE[idx % len(SEED_EXPERIENCE)],
+            "aspect": SEED_ASPECTS[idx % len(SEED_ASPECTS)]
+        },
+        "goals": {
+            "interest": SEED_GOAL_INTERESTS[idx % len(SEED_GOAL_INTERESTS)],
+            "goal": SEED_GOALS[idx % len(SEED_GOALS)],
+            "activity": SEED_GOAL_ACTIVITIES[idx % len(SEED_GOAL_ACTIVITIES)]
+        },
+        "last_updated": last_updated,
+        "safety_checked": True,
+        "ai_verified": True
+    }
+
+
 def initMatchmakersData():
     """Initialize sample matchmakers data for testing."""
     with app.app_context():
@@ -252,156 +643,40 @@ def initMatchmakersData():
 
         target_count = 25
 
-        # Find users who already have personas assigned
-        persona_user_ids = {up.user_id for up in UserPersona.query.all()}
-        persona_users = []
-        if persona_user_ids:
-            persona_users = User.query.filter(User.id.in_(persona_user_ids)).all()
+        # Users who already have personas assigned come first, then other existing users fill
+        # up to the target; only the ids are needed, picked in one query
+        has_persona = User.id.in_(select(UserPersona.user_id))
+        user_ids = db.session.scalars(
+            select(User.id).order_by(case((has_persona, 0), else_=1), User.id).limit(target_count)
+        ).all()
 
-        users = list(persona_users)
+        # Users that already have a profile record are skipped; found in one query up front
+        existing_ids = set(db.session.execute(
+            select(MatchmakersData.user_id).where(
+                MatchmakersData.section == 'profile',
+                MatchmakersData.user_id.in_(user_ids)
+            )
+        ).scalars())
 
-        # If fewer than target, fill with other existing users
-        if len(users) < target_count:
-            remaining = target_count - len(users)
-            if persona_user_ids:
-                extra_users = User.query.filter(~User.id.in_(persona_user_ids)).limit(remaining).all()
-            else:
-                extra_users = User.query.limit(remaining).all()
-            for u in extra_users:
-                if u not in users:
-                    users.append(u)
-
-        users = users[:target_count]
-
-        colors = ["Blue", "Green", "Red", "Purple", "Yellow", "Orange", "Teal", "Pink", "Indigo", "Gray"]
-        animals = ["Birds", "Cats", "Dogs", "Dolphins", "Foxes", "Wolves", "Owls", "Turtles", "Horses", "Otters"]
-        genres = ["Pop", "Rock", "Hip Hop", "Jazz", "Classical", "EDM", "Indie", "R&B", "Country", "Lo-fi"]
-        artists = ["Michael Jackson", "Taylor Swift", "Adele", "Drake", "Coldplay", "BTS", "Billie Eilish", "Bruno Mars", "The Weeknd", "Daft Punk"]
-        subjects = ["English", "Math", "Science", "History", "Computer Science", "Art", "Music", "PE", "Economics", "Biology"]
-
-        professions = ["entrepreneur", "student", "designer", "developer", "researcher", "writer", "artist", "mentor", "builder", "analyst"]
-        about_hobbies_1 = ["building things", "reading", "coding", "sketching", "music", "sports", "robotics", "gaming", "cooking", "traveling"]
-        about_hobbies_2 = ["trying new experiences", "learning languages", "making videos", "designing apps", "volunteering", "photography", "debate", "hiking", "drawing", "tinkering"]
-        activities = ["exploring new ideas", "working on projects", "collaborating", "brainstorming", "helping others", "testing prototypes", "researching", "planning", "iterating", "presenting"]
-        values = ["making an impact", "creativity", "growth", "teamwork", "curiosity", "excellence", "community", "balance", "innovation", "integrity"]
-
-        interest_h1 = ["drawing", "cycling", "playing board games", "baking", "filmmaking", "coding", "reading", "sports", "music", "3D printing"]
-        interest_h2 = ["photography", "skateboarding", "puzzles", "writing", "gardening", "design", "volunteering", "gaming", "yoga", "robotics"]
-        interest_h3 = ["chess", "running", "painting", "blogging", "travel", "swimming", "crafts", "podcasts", "DIY", "science fairs"]
-        topics = ["philosophy", "technology", "psychology", "history", "entrepreneurship", "science", "music", "design", "sports", "nature"]
-
-        skill1 = ["project management", "leadership", "time management", "public speaking", "problem solving", "team coordination", "analysis", "writing", "debugging", "design"]
-        skill2 = ["communication", "creativity", "organization", "research", "collaboration", "testing", "mentoring", "data literacy", "UI/UX", "strategy"]
-        skill3 = ["adaptability", "empathy", "focus", "planning", "prototyping", "iteration", "documentation", "presentation", "modeling", "optimization"]
-        experience = ["1-2 years", "2-3 years", "3-4 years", "4-5 years", "5+ years"]
-        aspects = ["learning new techniques", "leading teams", "building prototypes", "sharing ideas", "experimenting", "mentoring others", "iterating quickly", "solving puzzles", "shipping features", "reflecting on outcomes"]
-
-        goal_interests = ["web development", "app development", "robotics", "data science", "game design", "AI", "cybersecurity", "product design", "music production", "entrepreneurship"]
-        goals = ["collaborate on open-source projects", "build a portfolio", "launch a side project", "teach others", "win a hackathon", "publish research", "start a club", "create a startup", "improve skills", "ship an app"]
-        goal_activities = ["work on coding projects together", "pair program regularly", "share ideas", "review designs", "prototype quickly", "study together", "test products", "practice presentations", "brainstorm features", "co-write docs"]
-
-        for idx, user in enumerate(users):
-            existing = MatchmakersData.query.filter_by(user_id=user.id, section='profile').first()
-            if existing:
+        last_updated = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for idx, user_id in enumerate(user_ids):
+            if user_id in existing_ids:
                 continue
 
-            # MBTI personality types for personality_quiz
-            mbti_types = ["E_high", "E_moderate", "I_high", "I_moderate"]
-            mbti_feeling = ["F_high", "F_moderate", "T_high", "T_moderate"]
-            mbti_perception = ["J_high", "J_moderate", "P_high", "P_moderate"]
-            mbti_sensing = ["S_high", "S_moderate", "N_high", "N_moderate"]
-            
-            personality_traits = ["Extroverted", "Introverted"]
-            decision_traits = ["Empathetic", "Logical"]
-            lifestyle_traits = ["Structured", "Spontaneous"]
-
             profile_data = {
-                "profile_quiz": {
-                    "personality_quiz": {
-                        "1": mbti_types[idx % len(mbti_types)],
-                        "2": mbti_feeling[idx % len(mbti_feeling)],
-                        "3": mbti_perception[idx % len(mbti_perception)],
-                        "4": mbti_sensing[idx % len(mbti_sensing)],
-                        "5": mbti_sensing[(idx + 1) % len(mbti_sensing)],
-                        "6": mbti_types[(idx + 1) % len(mbti_types)],
-                        "7": mbti_feeling[(idx + 1) % len(mbti_feeling)],
-                        "8": mbti_sensing[(idx + 2) % len(mbti_sensing)],
-                        "9": mbti_sensing[(idx + 3) % len(mbti_sensing)],
-                        "10": mbti_sensing[(idx + 4) % len(mbti_sensing)],
-                        "11": mbti_feeling[(idx + 2) % len(mbti_feeling)],
-                        "12": mbti_feeling[(idx + 3) % len(mbti_feeling)],
-                        "13": mbti_feeling[(idx + 4) % len(mbti_feeling)]
-                    },
-                    "analysis": {
-                        "focus": ["communication", "problem solving", "creativity", "leadership", "analysis"][idx % 5],
-                        "depth": ["shallow", "moderate", "deep"][idx % 3],
-                        "personalityTraits": {
-                            "social": personality_traits[idx % len(personality_traits)],
-                            "decision": decision_traits[idx % len(decision_traits)],
-                            "lifestyle": lifestyle_traits[idx % len(lifestyle_traits)],
-                            "socialScore": 0,
-                            "introversionScore": 0,
-                            "thinkingScore": 0,
-                            "feelingScore": 0
-                        },
-                        "profileInsights": [
-                            {
-                                "category": "Color Preference",
-                                "value": colors[idx % len(colors)]
-                            },
-                            {
-                                "category": "Animal Preference",
-                                "value": animals[idx % len(animals)]
-                            },
-                            {
-                                "category": "Music Taste",
-                                "value": genres[idx % len(genres)]
-                            },
-                            {
-                                "category": "Academic Interest",
-                                "value": subjects[idx % len(subjects)]
-                            }
-                        ]
-                    }
-                },
-                "bio": {
-                    "about": {
-                        "profession": professions[idx % len(professions)],
-                        "hobby1": about_hobbies_1[idx % len(about_hobbies_1)],
-                        "hobby2": about_hobbies_2[idx % len(about_hobbies_2)],
-                        "activity": activities[idx % len(activities)],
-                        "value": values[idx % len(values)]
-                    },
-                    "interests": {
-                        "hobby1": interest_h1[idx % len(interest_h1)],
-                        "hobby2": interest_h2[idx % len(interest_h2)],
-                        "hobby3": interest_h3[idx % len(interest_h3)],
-                        "topic": topics[idx % len(topics)]
-                    },
-                    "skills": {
-                        "skill1": skill1[idx % len(skill1)],
-                        "skill2": skill2[idx % len(skill2)],
-                        "skill3": skill3[idx % len(skill3)],
-                        "experience": experience[idx % len(experience)],
-                        "aspect": aspects[idx % len(aspects)]
-                    },
-                    "goals": {
-                        "interest": goal_interests[idx % len(goal_interests)],
-                        "goal": goals[idx % len(goals)],
-                        "activity": goal_activities[idx % len(goal_activities)]
-                    },
-                    "last_updated": datetime.now(timezone.utc).isoformat(),
-                    "safety_checked": True,
-                    "ai_verified": True
-                },
+                "profile_quiz": _seed_profile_quiz(idx),
+                "bio": _seed_bio(idx, last_updated),
                 "matched_with": []
             }
 
-            record = MatchmakersData(user=user, section='profile', data=profile_data)
-            try:
-                record.create()
-            except ValueError:
-                continue
+            rows.append({'user_id': user_id, 'section': 'profile', 'data': profile_data})
+
+        # One executemany INSERT and a single commit for all new records
+        if rows:
+            db.session.execute(insert(MatchmakersData), rows)
+            db.session.commit()
+            bump_data_version()
 
-        print(f"  > MatchmakersData table initialized with {len(users)} profile records")
+        print(f"  > MatchmakersData table initialized with {len(user_ids)} profile records")
         print("  > initMatchmakersData() completed successfully!")
\ No newline at end of file
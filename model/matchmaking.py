@@ -1,84 +1,183 @@
 """Matchmaking / Profile Setup - JSON File Storage
 
 Simple JSON-based storage for profile setup tracking, independent from user.py
-Functions similar to the jokes API but for matchmaking setup data.
+Functions similar to the jokes API but for matchmaking setup data. Setups are stored
+one JSON object per line so a new setup is a single append.
+
+Locking: readers hold a shared flock on the setups file only while reading its bytes.
+Writers take the exclusive .lock file for the whole read-modify-write, then either append
+under an exclusive flock on the setups file or swap in a rewritten file with os.replace.
 """
 
-import json
+import orjson
 import os
 import fcntl
+import tempfile
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 from flask import current_app
 
 
+# Serializes read-modify-write cycles between threads; the .lock file does the same across processes
+_FILE_LOCK = threading.Lock()
+
+# Last parsed setups, reused while the file's stat signature is unchanged (it changes on every write)
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
 def get_profile_setups_file():
     """Get the path to the profile setups JSON file."""
     data_folder = current_app.config.get('DATA_FOLDER', 'instance/data')
     return os.path.join(data_folder, 'profile_setups.json')
 
 
-def _read_profile_setups():
-    """Read profile setups from JSON file with file locking."""
+def _load_profile_setups():
+    """Read profile setups from the setups file with file locking; parsed and indexed once per file version.
+
+    Returns {'list': [...], 'by_uid': {uid: setup}}, shared between callers and not to be mutated.
+    """
     setups_file = get_profile_setups_file()
-    if not os.path.exists(setups_file):
-        return []
     try:
-        with open(setups_file, 'r') as f:
+        with open(setups_file, 'rb') as f:
             fcntl.flock(f, fcntl.LOCK_SH)
             try:
-                data = json.load(f)
-            except Exception:
-                data = []
-            fcntl.flock(f, fcntl.LOCK_UN)
+                st = os.fstat(f.fileno())
+                key = (setups_file, st.st_ino, st.st_mtime_ns, st.st_size)
+                with _CACHE_LOCK:
+                    if _CACHE.get('key') == key:
+                        return _CACHE['data']
+                content = f.read()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        # Parsed after the lock is released; the bytes read are already a consistent snapshot
+        setups = _parse_profile_setups(content)
+        by_uid = {}
+        for setup in setups:
+            by_uid.setdefault(setup.get('uid'), setup)  # First record wins, as with the old linear scan
+        data = {'list': setups, 'by_uid': by_uid}
+        with _CACHE_LOCK:
+            _CACHE.update(key=key, data=data)
         return data
     except Exception:
-        return []
+        return {'list': [], 'by_uid': {}}
+
+
+def _read_profile_setups():
+    """Read all profile setups (the shared cached list)."""
+    return _load_profile_setups()['list']
+
+
+def _parse_profile_setups(content):
+    """Parse newline-delimited JSON setups; files from before the NDJSON switch hold one JSON array."""
+    if _is_json_array(content):
+        try:
+            return orjson.loads(content)
+        except Exception:
+            return []
+    setups = []
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        try:
+            setups.append(orjson.loads(line))
+        except Exception:
+            continue  # Skip a line torn by a crash mid-append
+    return setups
+
+
+def _is_json_array(content):
+    """True if the raw file content is a single JSON array rather than NDJSON lines."""
+    return content.lstrip()[:1] == b'['
 
 
 def _write_profile_setups(data):
-    """Write profile setups to JSON file with file locking."""
+    """Write all profile setups atomically: dump to a temp file, then swap it in with os.replace."""
+    setups_file = get_profile_setups_file()
+    setups_dir = os.path.dirname(setups_file)
+    os.makedirs(setups_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=setups_dir, prefix='.profile_setups.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(orjson.dumps(setup, option=orjson.OPT_APPEND_NEWLINE) for setup in data)
+        os.replace(tmp_path, setups_file)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _append_profile_setup(setup):
+    """Append one setup as a single NDJSON line instead of rewriting the whole file."""
     setups_file = get_profile_setups_file()
     os.makedirs(os.path.dirname(setups_file), exist_ok=True)
-    with open(setups_file, 'w') as f:
+    with open(setups_file, 'a+b') as f:
         fcntl.flock(f, fcntl.LOCK_EX)
-        json.dump(data, f, indent=2)
-        fcntl.flock(f, fcntl.LOCK_UN)
+        try:
+            line = orjson.dumps(setup, option=orjson.OPT_APPEND_NEWLINE)
+            # Start on a fresh line if an earlier append was cut short
+            if f.seek(0, os.SEEK_END) and os.pread(f.fileno(), 1, f.tell() - 1) != b'\n':
+                line = b'\n' + line
+            f.write(line)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _profile_setups_need_rewrite():
+    """True while the file is still a legacy JSON array, which can't be appended to."""
+    try:
+        with open(get_profile_setups_file(), 'rb') as f:
+            return _is_json_array(f.read(64))
+    except FileNotFoundError:
+        return False
+
+
+@contextmanager
+def _profile_setups_write_lock():
+    """Hold an exclusive lock (thread and process wide) around a read-modify-write of the setups."""
+    lock_path = get_profile_setups_file() + '.lock'
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    with _FILE_LOCK, open(lock_path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
 
 
 def profile_setup_exists(uid):
     """Check if a profile setup exists for a given uid."""
-    setups = _read_profile_setups()
-    return any(setup['uid'] == uid for setup in setups)
+    return uid in _load_profile_setups()['by_uid']
 
 
 def create_profile_setup(uid):
     """Create a new profile setup record for a user."""
-    setups = _read_profile_setups()
-    
-    # Check if already exists
-    if any(setup['uid'] == uid for setup in setups):
-        return None
-    
-    # Create new record
-    new_setup = {
-        'id': len(setups) + 1,
-        'uid': uid,
-        'created_at': datetime.utcnow().isoformat()
-    }
-    setups.append(new_setup)
-    _write_profile_setups(setups)
+    with _profile_setups_write_lock():
+        loaded = _load_profile_setups()
+        setups = loaded['list']
+        
+        # Check if already exists
+        if uid in loaded['by_uid']:
+            return None
+        
+        # Create new record
+        new_setup = {
+            'id': len(setups) + 1,
+            'uid': uid,
+            'created_at': datetime.utcnow().isoformat()
+        }
+        if _profile_setups_need_rewrite():
+            _write_profile_setups(setups + [new_setup])
+        else:
+            _append_profile_setup(new_setup)
     return new_setup
 
 
 def get_profile_setup(uid):
     """Get a profile setup record for a given uid."""
-    setups = _read_profile_setups()
-    for setup in setups:
-        if setup['uid'] == uid:
-            return setup
-    return None
+    return _load_profile_setups()['by_uid'].get(uid)
 
 
 def get_all_profile_setups():
     """Get all profile setups."""
-    return _read_profile_setups()
+    return list(_read_profile_setups())
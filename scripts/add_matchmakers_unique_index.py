@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Add the (user_id, section) unique index to matchmakers_data
+
+MatchmakersData upserts rely on this index as their conflict target. db.create_all() only
+adds it to new tables, so run this once against an existing database. Duplicate records
+for the same user and section are collapsed first, keeping the most recently updated one.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from main import app, db  # Imports every model so all mappers can be configured
+from model.matchmakers import MatchmakersData
+
+def add_matchmakers_unique_index():
+    """Remove duplicate (user_id, section) records and create the unique index"""
+    with app.app_context():
+        try:
+            seen = set()
+            removed = 0
+            records = MatchmakersData.query.order_by(
+                MatchmakersData.user_id, MatchmakersData.section, MatchmakersData.updated_at.desc()
+            ).all()
+            for record in records:
+                key = (record.user_id, record.section)
+                if key in seen:
+                    db.session.delete(record)
+                    removed += 1
+                else:
+                    seen.add(key)
+            db.session.commit()
+            print(f"✓ Removed {removed} duplicate matchmakers records")
+
+            for index in MatchmakersData.__table__.indexes:
+                index.create(db.engine, checkfirst=True)
+            print("✓ Unique index uq_matchmakers_user_section is in place")
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error adding unique index: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = add_matchmakers_unique_index()
+    sys.exit(0 if success else 1)
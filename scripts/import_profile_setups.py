@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Import the legacy profile_setups.json store into MatchmakersData
+
+The /api/match endpoints keep profile data in the matchmakers_data table ('profile' section);
+the JSON file written by model/matchmaking.py predates that. Run this once to copy each uid's
+setup data into a profile record so the file store can be retired. Existing records are left as-is.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from main import app, db  # Imports every model so all mappers can be configured
+from model.user import User
+from model.matchmakers import MatchmakersData
+from model.matchmaking import get_all_profile_setups
+
+def import_profile_setups():
+    """Create a 'profile' record from each setup in profile_setups.json whose user lacks one"""
+    with app.app_context():
+        try:
+            setups = get_all_profile_setups()
+            setups_by_uid = {setup['uid']: setup for setup in setups if setup.get('uid')}
+            users = User.query.filter(User._uid.in_(setups_by_uid)).all() if setups_by_uid else []
+
+            created = 0
+            for user in users:
+                if not MatchmakersData.get_user_matchmakers_data(user.id, section='profile'):
+                    data = setups_by_uid[user.uid].get('data') or {}
+                    db.session.add(MatchmakersData(user, 'profile', data))
+                    created += 1
+            db.session.commit()
+
+            print(f"✓ Read {len(setups)} profile setups ({len(setups_by_uid) - len(users)} unknown uids skipped)")
+            print(f"✓ Created {created} profile records")
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error importing profile setups: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    success = import_profile_setups()
+    sys.exit(0 if success else 1)
@@ -12,7 +12,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-from __init__ import app, db
+from main import app, db  # Imports every model so all mappers can be configured
+from sqlalchemy import inspect
 from model.user import User  # Import first to ensure users table exists
 from model.database_audit import DatabaseMetrics, ErrorLog, FetchLog, ChangeLog, DatabaseStatus
 
@@ -21,13 +22,34 @@ def init_audit_tables():
     with app.app_context():
         print("Creating database audit tables...")
         
+        # One inspector pass finds what is missing, so DDL is only issued for that
+        inspector = inspect(db.engine)
+        existing_tables = set(inspector.get_table_names())
+        
         try:
-            # Create all tables
-            db.create_all()
-            print("✓ All tables created successfully")
+            # Create only the tables that don't exist yet
+            missing = [table for table in db.metadata.sorted_tables if table.name not in existing_tables]
+            if missing:
+                db.metadata.create_all(db.engine, tables=missing)
+            print(f"✓ All tables in place ({len(missing)} created)")
         except Exception as e:
             print(f"✓ Tables creation attempt completed (some existing tables may have been created)")
         
+        # create_all skips tables that already exist, so add any indexes introduced since
+        for model in (DatabaseMetrics, ErrorLog, FetchLog, ChangeLog, DatabaseStatus):
+            table = model.__table__
+            if table.name not in existing_tables:
+                continue  # Just created along with its indexes
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing_indexes:
+                    continue
+                try:
+                    index.create(db.engine)
+                except Exception as e:
+                    print(f"✗ Could not create index {index.name}: {str(e)}")
+        print("✓ Audit table indexes checked")
+        
         try:
             # Create initial DatabaseStatus if it doesn't exist
             status = DatabaseStatus.query.first()
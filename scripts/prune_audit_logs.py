@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Prune old rows from the audit log tables
+
+fetch_logs, error_logs and change_logs only ever grow, while the control panel only reads
+recent entries. Run this periodically (e.g. from cron) to delete rows older than the retention
+window so the tables and their timestamp indexes stay small. Rows are deleted in batches so
+no single statement holds locks for long.
+
+Usage: scripts/prune_audit_logs.py [days]   (default 30)
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from main import app, db  # Imports every model so all mappers can be configured
+from sqlalchemy import delete, select
+from model.database_audit import ErrorLog, FetchLog, ChangeLog, utc_hours_ago
+
+DEFAULT_RETENTION_DAYS = 30
+BATCH_SIZE = 5000
+
+def prune_audit_logs(days=DEFAULT_RETENTION_DAYS):
+    """Delete audit log rows older than the given number of days"""
+    with app.app_context():
+        try:
+            for model in (FetchLog, ErrorLog, ChangeLog):
+                removed = 0
+                while True:
+                    # MySQL can't LIMIT inside an IN subquery, so fetch each batch of ids first
+                    ids = db.session.execute(
+                        select(model.id).where(model.timestamp < utc_hours_ago(days * 24)).limit(BATCH_SIZE)
+                    ).scalars().all()
+                    if not ids:
+                        break
+                    db.session.execute(delete(model).where(model.id.in_(ids)))
+                    db.session.commit()
+                    removed += len(ids)
+                print(f"✓ Removed {removed} rows from {model.__tablename__}")
+            return True
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"✗ Error pruning audit logs: {str(e)}")
+            return False
+
+if __name__ == '__main__':
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_RETENTION_DAYS
+    success = prune_audit_logs(days)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,46 @@
+"""Shared setup for the API tests: a fresh schema, a few users and a JWT-authenticated client.
+
+Tests use their own SQLite database (instance/volumes/user_management_test.db).
+Run from the repository root: python -m unittest discover tests
+"""
+
+import os
+import sys
+
+os.environ.setdefault('DB_NAME', 'user_management_test')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jwt
+
+from main import app, db  # Imports every model so all mappers can be configured
+from model.user import User
+
+app.config['TESTING'] = True
+
+
+def reset_database():
+    """Drop and recreate every table, then add one regular user and one admin."""
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        for uid, role in (('alice', 'User'), ('admin', 'Admin')):
+            User(name=uid, uid=uid, password='password', role=role).create()
+
+
+def client_for(uid):
+    """A test client carrying a JWT cookie for the given uid."""
+    client = app.test_client()
+    token = jwt.encode({'_uid': uid}, app.config['SECRET_KEY'], algorithm='HS256')
+    client.set_cookie(app.config['JWT_TOKEN_NAME'], token)
+    return client
+
+
+def session_client_for(uid):
+    """A test client logged in through Flask-Login's session, for the server-rendered and control panel routes."""
+    client = app.test_client()
+    with app.app_context():
+        user_id = User.query.filter_by(_uid=uid).first().id
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
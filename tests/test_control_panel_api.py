@@ -0,0 +1,43 @@
+import unittest
+from datetime import datetime, timedelta
+
+from helpers import app, db, reset_database, session_client_for
+from model.database_audit import FetchLog
+
+
+class LogPaginationTest(unittest.TestCase):
+
+    def setUp(self):
+        reset_database()
+        self.client = session_client_for('admin')
+
+    def add_fetch_logs(self, timestamps):
+        with app.app_context():
+            db.session.add_all(FetchLog(timestamp=ts, endpoint=f'/e{i}', method='GET') for i, ts in enumerate(timestamps))
+            db.session.commit()
+
+    def walk_pages(self, limit):
+        ids, before = [], None
+        while True:
+            query = f'/api/control-panel/fetch-logs?limit={limit}' + (f'&before={before}' if before else '')
+            response = self.client.get(query)
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            ids.extend(log['id'] for log in body['data'])
+            before = body['next_before']
+            if not before:
+                return ids
+
+    def test_rows_sharing_a_timestamp_are_not_skipped(self):
+        # Whole seconds, as MySQL DATETIME stores them; the audit writer batches many rows per second
+        second = datetime.utcnow().replace(microsecond=0) - timedelta(minutes=5)
+        self.add_fetch_logs([second] * 5 + [second - timedelta(seconds=1)] * 2)
+        self.assertEqual(self.walk_pages(limit=2), [5, 4, 3, 2, 1, 7, 6])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/control-panel/fetch-logs?before=yesterday')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from helpers import app, reset_database
+from api import groq_bio_api
+
+
+def completion(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+# Longer than PREFILTER_MAX_LENGTH, so these always go to Groq unless cached
+LONG_BIO = 'I like hiking and long walks on weekends. ' * 50
+
+SAFE = json.dumps({'is_safe': True, 'risk_score': 0, 'issues_found': [], 'severity': 'safe', 'message': 'ok', 'suggestions': []})
+
+
+class GroqRateLimitTest(unittest.TestCase):
+
+    def setUp(self):
+        reset_database()
+        self.client = app.test_client()
+        groq_bio_api.analysis_cache.clear()
+        groq_bio_api.user_buckets.clear()
+        groq_bio_api.groq_bucket.tokens = groq_bio_api.groq_bucket.capacity
+        patcher = mock.patch.object(groq_bio_api, 'get_groq_client')
+        self.groq = patcher.start().return_value
+        self.groq.chat.completions.create.return_value = completion(SAFE)
+        self.addCleanup(patcher.stop)
+
+    def analyze(self, text):
+        return self.client.post('/api/analyze-bio-safety', json={'bio_text': text})
+
+    def test_prefilter_and_cache_hits_are_not_charged(self):
+        take = groq_bio_api.TokenBucket.take
+        with mock.patch.object(groq_bio_api.TokenBucket, 'take', autospec=True, side_effect=take) as spy:
+            response = self.analyze('I like hiking')  # pre-filter
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['analysis']['message'], groq_bio_api.PREFILTER_MESSAGE)
+            self.assertEqual(spy.call_count, 0)
+            
+            response = self.analyze(LONG_BIO)  # user token + Groq token
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()['analysis']['message'], 'ok')
+            self.assertIn(groq_bio_api.bio_cache_key(LONG_BIO), groq_bio_api.analysis_cache)
+            
+            self.assertEqual(self.analyze(LONG_BIO).status_code, 200)  # cache hit
+            self.assertEqual(spy.call_count, 2)
+        self.groq.chat.completions.create.assert_called_once()
+
+    def test_spent_user_budget_is_429(self):
+        for i in range(groq_bio_api.USER_REQUESTS_PER_MINUTE):
+            self.assertEqual(self.analyze(f'{LONG_BIO} {i}').status_code, 200)
+        response = self.analyze(f'{LONG_BIO} again')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+
+    def test_spent_groq_budget_is_429_without_waiting(self):
+        groq_bio_api.groq_bucket.tokens, groq_bio_api.groq_bucket.updated = 0, time.monotonic()
+        started = time.monotonic()
+        response = self.analyze(LONG_BIO)
+        self.assertEqual(response.status_code, 429)
+        self.assertLess(time.monotonic() - started, 1)
+        self.groq.chat.completions.create.assert_not_called()
+
+    def test_unexpected_error_fails_closed(self):
+        self.groq.chat.completions.create.side_effect = RuntimeError('connection details')
+        response = self.analyze(LONG_BIO)
+        self.assertEqual(response.status_code, 500)
+        body = response.get_json()
+        self.assertFalse(body['success'])
+        self.assertNotIn('analysis', body)
+        self.assertNotIn('connection details', body['error'])
+
+
+class BatchSafetyTest(unittest.TestCase):
+
+    def setUp(self):
+        reset_database()
+        self.client = app.test_client()
+        groq_bio_api.analysis_cache.clear()
+        groq_bio_api.user_buckets.clear()
+        groq_bio_api.groq_bucket.tokens = groq_bio_api.groq_bucket.capacity
+        patcher = mock.patch.object(groq_bio_api, 'get_groq_client')
+        self.groq = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+
+    def analyze_batch(self, sections):
+        return self.client.post('/api/analyze-bio-safety-batch', json={'sections': sections})
+
+    def test_duplicate_section_names_are_rejected(self):
+        response = self.analyze_batch([
+            {'section': 'bio', 'bio_text': f'{LONG_BIO} one'},
+            {'section': 'bio', 'bio_text': f'{LONG_BIO} two'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.groq.chat.completions.create.assert_not_called()
+
+    def test_every_groq_call_is_charged_to_the_user(self):
+        gray = dict(json.loads(SAFE), risk_score=50)
+        self.groq.chat.completions.create.return_value = completion(json.dumps({
+            'analyses': [dict(gray, index=i) for i in range(groq_bio_api.TEXTS_PER_SAFETY_CALL)]
+        }))
+        response = self.analyze_batch([
+            {'section': f'section{i}', 'bio_text': f'{LONG_BIO} {i}'} for i in range(groq_bio_api.MAX_BATCH_SECTIONS)
+        ])
+        self.assertEqual(response.status_code, 200)
+        # Two screen calls, then both chunks again for review
+        self.assertEqual(self.groq.chat.completions.create.call_count, 4)
+        bucket = groq_bio_api.user_buckets['127.0.0.1']
+        self.assertAlmostEqual(bucket.capacity - bucket.tokens, 4, delta=0.5)
+
+    def test_mixed_type_indexes_follow_the_model_index(self):
+        flagged = dict(json.loads(SAFE), is_safe=False, risk_score=90, severity='high')
+        safe = json.loads(SAFE)
+        self.groq.chat.completions.create.return_value = completion(json.dumps({
+            'analyses': [dict(flagged, index='1'), dict(safe, index=0)]
+        }))
+        response = self.analyze_batch([
+            {'section': 'bio', 'bio_text': f'{LONG_BIO} one'},
+            {'section': 'hobbies', 'bio_text': f'{LONG_BIO} two'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        analyses = response.get_json()['analyses']
+        self.assertTrue(analyses['bio']['is_safe'])
+        self.assertFalse(analyses['hobbies']['is_safe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
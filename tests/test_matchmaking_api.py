@@ -0,0 +1,69 @@
+import unittest
+
+from sqlalchemy import text
+
+from helpers import app, client_for, db, reset_database
+from model import matchmakers
+from model.matchmakers import MatchmakersData, UPSERT_INDEX_NAME
+from model.user import User
+
+
+class AddIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        reset_database()
+        self.client = client_for('alice')
+
+    def profile_data(self):
+        with app.app_context():
+            user = User.query.filter_by(_uid='alice').first()
+            return MatchmakersData.get_user_matchmakers_data(user.id, section='profile')[0].data
+
+    def test_string_index(self):
+        response = self.client.post('/api/match/add', json={'index': 'hobby', 'data': 'chess'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.profile_data(), {'hobby': 'chess'})
+
+    def test_numeric_index_is_stored_as_text(self):
+        response = self.client.post('/api/match/add', json={'index': 7, 'data': 'lucky'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['index'], '7')
+        self.assertEqual(self.profile_data(), {'7': 'lucky'})
+
+        response = self.client.delete('/api/match/add', json={'index': 7})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.profile_data(), {})
+
+    def test_non_scalar_index_is_rejected(self):
+        response = self.client.post('/api/match/add', json={'index': ['a'], 'data': 1})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class UpsertWithoutUniqueIndexTest(unittest.TestCase):
+    """Tables created before the unique index existed must not collect duplicate records."""
+
+    def setUp(self):
+        reset_database()
+        with app.app_context():
+            db.session.execute(text(f'DROP INDEX {UPSERT_INDEX_NAME}'))
+            db.session.commit()
+        matchmakers._upsert_index_present.clear()
+        self.client = client_for('alice')
+
+    def tearDown(self):
+        matchmakers._upsert_index_present.clear()
+
+    def test_repeated_adds_update_one_record(self):
+        for index, value in (('hobby', 'chess'), ('hobby', 'go'), ('food', 'ramen')):
+            response = self.client.post('/api/match/add', json={'index': index, 'data': value})
+            self.assertEqual(response.status_code, 201)
+        with app.app_context():
+            user = User.query.filter_by(_uid='alice').first()
+            records = MatchmakersData.get_user_matchmakers_data(user.id, section='profile')
+            self.assertEqual(len(records), 1)
+            self.assertEqual(records[0].data, {'hobby': 'go', 'food': 'ramen'})
+
+
+if __name__ == '__main__':
+    unittest.main()